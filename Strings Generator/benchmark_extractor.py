@@ -0,0 +1,107 @@
+"""Compare the single-pass extractor with the old four re.search scans.
+
+Usage:
+    python benchmark_extractor.py                  # synthetic mod: 5000 part files, 10000 other files
+    python benchmark_extractor.py --parts 20000 --other 0
+    python benchmark_extractor.py path/to/mod      # a real mod folder
+
+File contents are read into memory first, so only parsing is timed.
+"""
+import argparse
+import random
+import re
+import time
+
+from strings_generator import REQUIRED_FIELDS, extract_parts, iter_rules_files
+
+
+def legacy_extract(content):
+    """The previous process_rules_file parsing: four full-content searches, first match only."""
+    id_match = re.search(r'ID\s*=\s*([a-zA-Z0-9_.]+)', content, re.IGNORECASE)
+    name_key_match = re.search(r'NameKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
+    icon_key_match = re.search(r'IconNameKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
+    description_key_match = re.search(r'DescriptionKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
+    if id_match and name_key_match and icon_key_match:
+        return [(id_match.group(1), name_key_match.group(1), icon_key_match.group(1),
+                 description_key_match.group(1) if description_key_match else None)]
+    return []
+
+
+def single_pass_extract(content):
+    return [
+        part for part in extract_parts(content)
+        if all(part.get(field) for field, _name in REQUIRED_FIELDS)
+    ]
+
+
+def synthetic_part(index, rng):
+    """A part file roughly the size and shape of a real one, sometimes with two Parts."""
+    components = "".join(
+        f"\t\tComponent{c}\n\t\t{{\n\t\t\tType = Thing\n\t\t\tGrid = {rng.randint(1, 9)}\n"
+        f"\t\t\tToggleID = \"toggle_{c}\"\n\t\t\tValue = {rng.random():.3f} // tuned\n\t\t}}\n"
+        for c in range(rng.randint(5, 30))
+    )
+    parts = []
+    for sub in range(2 if index % 10 == 0 else 1):
+        name = f"Part{index}_{sub}"
+        parts.append(
+            f"Part : <./Data/ships/base_part.rules>/Part\n{{\n"
+            f"\tNameKey = \"Parts/{name}\"\n\tIconNameKey = \"Parts/{name}Icon\"\n"
+            f"\tDescriptionKey = \"Parts/{name}Desc\"\n\tID = bench.{name.lower()}\n"
+            f"\tEditorGroups = [\"Weapons\"]\n\tComponents\n\t{{\n{components}\t}}\n}}\n"
+        )
+    return "".join(parts)
+
+
+def synthetic_other(index, rng):
+    """A non-Part file (shots, effects, components) without any of the keys."""
+    fields = "".join(
+        f"\t\tField{f} = {rng.random():.3f}\n\t\tGrid = {rng.randint(1, 9)}\n"
+        for f in range(rng.randint(5, 40))
+    )
+    return f"Shot{index}\n{{\n\tType = BulletShot\n\tEffects\n\t{{\n{fields}\t}}\n}}\n"
+
+
+def load_contents(args):
+    if args.mod:
+        contents = []
+        for path in iter_rules_files(args.mod):
+            with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                contents.append(file.read())
+        return contents
+    rng = random.Random(args.seed)
+    contents = [synthetic_part(i, rng) for i in range(args.parts)]
+    contents += [synthetic_other(i, rng) for i in range(args.other)]
+    return contents
+
+
+def time_extractor(extract, contents, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(extract(content)) for content in contents)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mod', nargs='?', help="Mod folder to benchmark instead of synthetic files")
+    parser.add_argument('--parts', type=int, default=5000, help="Number of synthetic part files")
+    parser.add_argument('--other', type=int, default=10000, help="Number of synthetic non-part files")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per extractor; the best is reported")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    contents = load_contents(args)
+    total_bytes = sum(len(content) for content in contents)
+    print(f"{len(contents)} files, {total_bytes / 1e6:.1f} MB")
+    for label, extract in (("four re.search scans", legacy_extract), ("single pass", single_pass_extract)):
+        elapsed, found = time_extractor(extract, contents, args.repeat)
+        per_file = elapsed / max(1, len(contents)) * 1e6
+        print(f"{label:22} {elapsed:8.3f} s  {per_file:8.1f} us/file  {found} entries")
+
+
+if __name__ == '__main__':
+    main()
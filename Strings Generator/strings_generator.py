@@ -1,22 +1,34 @@
+import io
 import os
 import re
 import json
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import logging
+import logging.handlers
+import atexit
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("rules_processor.log"),
-        logging.StreamHandler()
-    ]
-)
+from rules_watcher import RulesWatcher
 
 CONFIG_FILE = 'config.json'
 LANGUAGES = ['en', 'de', 'es', 'fr', 'pt-br', 'ru', 'zh-cn']
+# File reads are I/O bound, so more threads than cores pays off on slow or network drives
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# How often the output window picks up scan results, in milliseconds
+POLL_INTERVAL_MS = 50
+# How often the output window applies changes reported by the watcher, in milliseconds
+WATCH_INTERVAL_MS = 250
+LOG_FILE = "rules_processor.log"
+# Per-file parse results, stored next to config.json; bump the version when parsing changes
+PARSE_CACHE_FILE = 'parse_cache.json'
+PARSE_CACHE_VERSION = 1
+DEFAULT_LOG_LEVEL = 'INFO'
+_log_listener = None
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -28,76 +40,385 @@ def save_config(config):
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4)
 
+def setup_logging(level=None):
+    """Send log records through a queue so file and console writes happen on a listener thread.
+
+    The level comes from "log_level" in config.json (INFO by default); set it to
+    DEBUG to log every directory and file visited.
+    """
+    global _log_listener
+    if level is None:
+        level = load_config().get('log_level', DEFAULT_LOG_LEVEL)
+    if _log_listener is not None:
+        _log_listener.stop()
+        atexit.unregister(_log_listener.stop)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(threadName)s - %(message)s')
+    handlers = [logging.FileHandler(LOG_FILE, encoding='utf-8'), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    try:
+        root_logger.setLevel(str(level).upper())
+    except ValueError:
+        root_logger.setLevel(DEFAULT_LOG_LEVEL)
+        logging.warning("Unknown log_level %r in %s, using %s", level, CONFIG_FILE, DEFAULT_LOG_LEVEL)
+    listener.start()
+    # Flush whatever is still queued when the app exits
+    atexit.register(listener.stop)
+    _log_listener = listener
+    return listener
+
+def log_scan_summary(root_path, stats, elapsed, cancelled=False):
+    logging.info(
+        "Scan %s: root=%s files=%d cached=%d entries=%d skipped=%d elapsed=%.2fs",
+        "cancelled" if cancelled else "finished", root_path,
+        stats['files'], stats.get('cached', 0), stats['entries'], stats['skipped'], elapsed
+    )
+
+KEY_FIELDS = {'id': 'id', 'namekey': 'name_key', 'iconnamekey': 'icon_key', 'descriptionkey': 'description_key'}
+REQUIRED_FIELDS = (('id', 'ID'), ('name_key', 'NameKey'), ('icon_key', 'IconNameKey'))
+
+# Comments, strings, braces and "Key =" lines of a strings file
+STRINGS_TOKEN_PATTERN = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\{|\}|(?P<key>[^\s={}"/]+)[ \t]*=|[^\s{}"/=]+',
+    re.DOTALL
+)
+
+# "Key = value" for the four keys, case-insensitively. Every alternative starts with
+# a plain character (I/i, N/n, D/d) so the regex engine can skip ahead to candidate
+# positions instead of trying each alternative at every character.
+KEY_ALTERNATIVES = '|'.join(
+    rf'{first}(?i:{name[1:]})[ \t]*=[ \t]*(?:"[^"\n]*"|[a-zA-Z0-9_.]+)'
+    for name in ('ID', 'NameKey', 'IconNameKey', 'DescriptionKey')
+    for first in (name[0].upper(), name[0].lower())
+)
+# Comments and strings are matched so keys (or "//") inside them are skipped
+SKIP_ALTERNATIVES = r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"'
+KEY_PATTERN = re.compile(SKIP_ALTERNATIVES + '|' + KEY_ALTERNATIVES, re.DOTALL)
+# Same, plus braces, for files that define more than one Part
+BLOCK_PATTERN = re.compile(SKIP_ALTERNATIVES + r'|\{|\}|' + KEY_ALTERNATIVES, re.DOTALL)
+
+def _parse_key(content, match):
+    """Return (field, value) for a key match, or None if it is the tail of a longer word like 'Grid'."""
+    start = match.start()
+    if start and (content[start - 1].isalnum() or content[start - 1] == '_'):
+        return None
+    name, _, value = match.group(0).partition('=')
+    return KEY_FIELDS[name.strip().lower()], value.strip().strip('"')
+
+def _extract_blocks(content, expected=None):
+    """Return the keys written directly inside each { } block, in file order.
+
+    expected is the number of string keys in the content; once all of them are
+    found and the block holding the last one has its ID, the rest is skipped.
+    """
+    blocks = [(0, {})]  # Stack of (start offset, keys) for the blocks we are inside
+    closed = []
+    for match in BLOCK_PATTERN.finditer(content):
+        token = match.group(0)
+        if token == '{':
+            blocks.append((match.start(), {}))
+        elif token == '}':
+            if len(blocks) > 1:
+                closed.append(blocks.pop())
+        elif token[0] not in '/"':
+            key = _parse_key(content, match)
+            if not key:
+                continue
+            keys = blocks[-1][1]
+            if key[0] not in keys:
+                keys[key[0]] = key[1]
+                if expected is not None and key[0] != 'id':
+                    expected -= 1
+            if expected is not None and expected <= 0 and 'id' in keys:
+                break
+    closed.extend(blocks)  # Top level, plus any blocks left unclosed
+    closed.sort(key=lambda block: block[0])
+    return [keys for _start, keys in closed if keys]
+
+def extract_parts(content):
+    """Return the ID and string keys of every Part in the content, in file order.
+
+    Plain substring counts decide how much work a file needs: files without a
+    NameKey can't hold an entry and are skipped, and files with several go
+    straight to one brace-tracking pass, so each { } block gets just the keys
+    written directly inside it; it stops once every counted key is found. A
+    single-Part file is scanned for its keys only until all of them are found,
+    skipping comments, strings and words that merely end in "id". An
+    unexpected repeated key (IDs in nested blocks) falls back to the
+    brace-tracking pass.
+    """
+    lowered = content.lower()
+    icon_keys = lowered.count('iconnamekey')
+    name_keys = lowered.count('namekey') - icon_keys
+    if name_keys <= 0:
+        return []
+    if name_keys > 1:
+        return _extract_blocks(content, name_keys + icon_keys + lowered.count('descriptionkey'))
+    wanted = len(KEY_FIELDS) if 'descriptionkey' in lowered else len(KEY_FIELDS) - 1
+    keys = {}
+    for match in KEY_PATTERN.finditer(content):
+        if match.group(0)[0] in '/"':
+            continue
+        key = _parse_key(content, match)
+        if not key:
+            continue
+        if key[0] in keys:
+            return _extract_blocks(content)
+        keys[key[0]] = key[1]
+        if len(keys) == wanted:
+            break
+    return [keys] if keys else []
+
+def part_strings(part):
+    """Return the (string key, alignment tabs) lines of a Part's entry."""
+    # Extract the last part after '/'
+    strings = [
+        (part['name_key'].split("/")[-1], '\t\t\t'),
+        (part['icon_key'].split("/")[-1], '\t\t'),
+    ]
+    if part.get('description_key'):
+        strings.append((part['description_key'].split("/")[-1], '\t'))
+    return strings
+
+def format_entry(part, strings=None, values=None):
+    """Format one Part's string entries with a comment for the ID and proper spacing.
+
+    strings limits the entry to some of part_strings(part), e.g. only the missing ones.
+    values maps string keys to the text to write; keys not in it get their own name.
+    """
+    if strings is None:
+        strings = part_strings(part)
+    entry = f'\n\t// {part["id"]}\n'
+    for key, tabs in strings:
+        value = values.get(key, key) if values else key
+        entry += f'\t{key}{tabs}= "{value}"\n'
+    return entry
+
+def format_entry_names_only(part):
+    """Format just the NameKey and IconNameKey strings of a Part, leaving out the description."""
+    return format_entry(part, part_strings(part)[:2])
+
+# Output filters and formatters. A filter takes a Part ID and returns True to
+# keep it; a formatter takes a part dict and returns its entry text.
+
+def id_prefix_filter(*prefixes):
+    """Keep Parts whose ID starts with one of the prefixes, e.g. id_prefix_filter('SW.')."""
+    return lambda part_id: part_id.startswith(prefixes)
+
+def id_pattern_filter(pattern):
+    """Keep Parts whose ID matches a regular expression from its start. The pattern is compiled once."""
+    return re.compile(pattern).match
+
+# One strings file to render from a scan: every Part that id_filter keeps (all if None), written with formatter
+StringsOutput = namedtuple('StringsOutput', 'name id_filter formatter', defaults=(None, format_entry))
+
 def process_rules_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
         content = file.read()
 
-    # Updated regex patterns
-    id_match = re.search(r'ID\s*=\s*([a-zA-Z0-9_.]+)', content, re.IGNORECASE)
-    name_key_match = re.search(r'NameKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
-    icon_key_match = re.search(r'IconNameKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
-    description_key_match = re.search(r'DescriptionKey\s*=\s*"([^"]+)"', content, re.IGNORECASE)
-
-    entries = []
+    parts = extract_parts(content)
+    entries = [part for part in parts if all(part.get(field) for field, _name in REQUIRED_FIELDS)]
 
-    if id_match and name_key_match and icon_key_match:
-        id_value = id_match.group(1)
-        name_key = name_key_match.group(1)
-        icon_key = icon_key_match.group(1)
-        description_key = description_key_match.group(1) if description_key_match else None
-
-        # Extract the last part after '/'
-        name_entry = name_key.split("/")[-1]
-        icon_entry = icon_key.split("/")[-1]
-        description_entry = description_key.split("/")[-1] if description_key else None
-
-        # Format the output with a comment for the ID and proper spacing
-        entry = f'\n\t// {id_value}\n'
-        entry += f'\t{name_entry}\t\t\t= "{name_entry}"\n'
-        entry += f'\t{icon_entry}\t\t= "{icon_entry}"\n'
-        if description_entry:
-            entry += f'\t{description_entry}\t= "{description_entry}"\n'
-
-        entries.append(entry)
-        logging.info(f"Processed file: {file_path}")
+    if entries:
+        logging.debug("Processed file: %s (%d entries)", file_path, len(entries))
+    elif not parts:
+        logging.debug("No string keys in file: %s", file_path)
     else:
-        missing = []
-        if not id_match:
-            missing.append("ID")
-        if not name_key_match:
-            missing.append("NameKey")
-        if not icon_key_match:
-            missing.append("IconNameKey")
-        logging.warning(f"Missing keys in file: {file_path}. Missing: {', '.join(missing)}")
+        found = set()
+        for part in parts:
+            found.update(field for field, value in part.items() if value)
+        missing = [name for field, name in REQUIRED_FIELDS if field not in found]
+        if not missing:
+            # Every key is there, just never all in the same block
+            missing = ["ID/NameKey/IconNameKey in the same block"]
+        logging.warning("Missing keys in file: %s. Missing: %s", file_path, ', '.join(missing))
 
     return entries
 
-def process_rules_directory(root_path):
+def iter_rules_stats(root_path):
+    """Yield (file_path, mtime_ns, size) for every .rules file below root_path, top-down, using os.scandir.
+
+    The stat comes from the directory listing itself on Windows, so this costs
+    no extra system calls there.
+    """
+    stack = [root_path]
+    while stack:
+        directory = stack.pop()
+        logging.debug("Searching in directory: %s", directory)
+        try:
+            with os.scandir(directory) as it:
+                dir_entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logging.warning("Could not read directory: %s (%s)", directory, e)
+            continue
+        subdirs = []
+        for entry in dir_entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.rules'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, stat.st_mtime_ns, stat.st_size
+        # Reversed so the stack visits subdirectories in alphabetical order
+        stack.extend(reversed(subdirs))
+
+def iter_rules_files(root_path):
+    """Yield every .rules file below root_path, top-down."""
+    for file_path, _mtime_ns, _size in iter_rules_stats(root_path):
+        yield file_path
+
+class ParseCache:
+    """process_rules_file results for every file seen, keyed by path and checked against mtime and size.
+
+    Stored as compact JSON next to config.json. A file is only re-parsed when
+    its modification time or size changed, so a warm run over an unchanged mod
+    costs little more than listing its directories.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), PARSE_CACHE_FILE)
+        self.files = {}  # abspath -> [mtime_ns, size, [[id, name_key, icon_key, description_key], ...]]
+        self.hits = 0
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == PARSE_CACHE_VERSION:
+                self.files = data['files']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # Missing or unreadable cache: start from scratch
+
+    def get(self, file_path, mtime_ns, size):
+        cached = self.files.get(os.path.abspath(file_path))
+        if cached is None or cached[0] != mtime_ns or cached[1] != size:
+            return None
+        self.hits += 1
+        return [
+            {'id': part_id, 'name_key': name_key, 'icon_key': icon_key, 'description_key': description_key}
+            for part_id, name_key, icon_key, description_key in cached[2]
+        ]
+
+    def put(self, file_path, mtime_ns, size, entries):
+        self.files[os.path.abspath(file_path)] = [mtime_ns, size, [
+            [part['id'], part['name_key'], part['icon_key'], part.get('description_key')]
+            for part in entries
+        ]]
+        self.dirty = True
+
+    def prune(self, root_path, seen_paths):
+        """Forget files below root_path that weren't seen in the last complete scan."""
+        prefix = os.path.join(os.path.abspath(root_path), '')
+        seen = {os.path.abspath(path) for path in seen_paths}
+        stale = [path for path in self.files if path.startswith(prefix) and path not in seen]
+        for path in stale:
+            del self.files[path]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = json.dumps({'version': PARSE_CACHE_VERSION, 'files': self.files}, separators=(',', ':'))
+        write_file_atomic(self.path, data.encode('utf-8'))
+        self.dirty = False
+
+def iter_processed_files(root_path, workers=MAX_WORKERS, cache=None):
+    """Read and parse .rules files on a thread pool, yielding (file_path, entries) in scan order.
+
+    Files are queued while the directory walk is still running, but only a small
+    window at a time, so a consumer that stops early doesn't wait for the rest.
+    With a ParseCache, unchanged files are answered from it and new results are
+    stored in it.
+    """
+    def result(item):
+        file_path, mtime_ns, size, entries, future = item
+        if future is not None:
+            entries = future.result()
+            if cache is not None:
+                cache.put(file_path, mtime_ns, size, entries)
+        return file_path, entries
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for file_path, mtime_ns, size in iter_rules_stats(root_path):
+            entries = cache.get(file_path, mtime_ns, size) if cache is not None else None
+            future = executor.submit(process_rules_file, file_path) if entries is None else None
+            pending.append((file_path, mtime_ns, size, entries, future))
+            if len(pending) >= workers * 2:
+                yield result(pending.popleft())
+        while pending:
+            yield result(pending.popleft())
+
+def process_rules_directory(root_path, use_cache=True):
     entries = []
-    for root, dirs, files in os.walk(root_path):
-        logging.debug(f"Searching in directory: {root}")
-        for file_name in files:
-            if file_name.endswith('.rules'):
-                file_path = os.path.join(root, file_name)
-                logging.debug(f"Processing file: {file_path}")
-                entries += process_rules_file(file_path)
+    seen = []
+    stats = {'files': 0, 'entries': 0, 'skipped': 0, 'cached': 0}
+    cache = ParseCache() if use_cache else None
+    start = time.perf_counter()
+    for file_path, file_entries in iter_processed_files(root_path, cache=cache):
+        logging.debug("Processing file: %s", file_path)
+        seen.append(file_path)
+        stats['files'] += 1
+        stats['entries'] += len(file_entries)
+        stats['skipped'] += not file_entries
+        entries += file_entries
+    if cache is not None:
+        stats['cached'] = cache.hits
+        cache.prune(root_path, seen)
+        save_parse_cache(cache)
+    log_scan_summary(root_path, stats, time.perf_counter() - start)
     return entries
 
-def process_rules_directory_with_log(root_path):
-    entries = []
-    log = ""
-    for root, dirs, files in os.walk(root_path):
-        log += f"Searching in directory: {root}\n"
-        for file_name in files:
-            if file_name.endswith('.rules'):
-                file_path = os.path.join(root, file_name)
-                log += f"Processing file: {file_path}\n"
-                file_entries = process_rules_file(file_path)
-                if file_entries:
-                    entries += file_entries
-                else:
-                    log += f"Skipped file (missing keys): {file_path}\n"
-    return entries, log
+def save_parse_cache(cache):
+    try:
+        cache.save()
+    except OSError as e:
+        # Only costs a slower next run
+        logging.warning("Could not save parse cache %s (%s)", cache.path, e)
+
+def scan_rules_directory(root_path, results, cancel):
+    """Worker thread: put ('file', file_path, entries) on results for each file, then 'done', 'cancelled' or 'error'.
+
+    'done' and 'cancelled' carry the scan stats and elapsed seconds.
+    """
+    stats = {'files': 0, 'entries': 0, 'skipped': 0, 'cached': 0}
+    start = time.perf_counter()
+    try:
+        cache = ParseCache()
+        seen = []
+        files = iter_processed_files(root_path, cache=cache)
+        try:
+            for file_path, file_entries in files:
+                if cancel.is_set():
+                    # Keep what was parsed so far for the next run
+                    stats['cached'] = cache.hits
+                    save_parse_cache(cache)
+                    elapsed = time.perf_counter() - start
+                    log_scan_summary(root_path, stats, elapsed, cancelled=True)
+                    results.put(('cancelled', stats, elapsed))
+                    return
+                seen.append(file_path)
+                stats['files'] += 1
+                stats['entries'] += len(file_entries)
+                stats['skipped'] += not file_entries
+                results.put(('file', file_path, file_entries))
+        finally:
+            files.close()
+        stats['cached'] = cache.hits
+        cache.prune(root_path, seen)
+        save_parse_cache(cache)
+        elapsed = time.perf_counter() - start
+        log_scan_summary(root_path, stats, elapsed)
+        results.put(('done', stats, elapsed))
+    except Exception as e:
+        logging.exception("Scan failed: %s", root_path)
+        results.put(('error', str(e)))
 
 def select_mod_file():
     file_path = filedialog.askopenfilename(
@@ -110,56 +431,336 @@ def select_mod_file():
         config = load_config()
         config['root_dir'] = root_dir
         save_config(config)
-        entries, log = process_rules_directory_with_log(root_dir)
-        if entries:
-            display_output(entries, log)
-        else:
-            messagebox.showinfo("No Entries", "No valid entries found in the selected mod.rules file.")
+        display_output(root_dir)
 
-def display_output(entries, log=None):
+def display_output(root_dir):
+    """Open the output window and fill it from a background scan of root_dir as files are parsed."""
     output_window = tk.Toplevel()
     output_window.title("Generated .rules Entries")
 
     output_text = scrolledtext.ScrolledText(output_window, wrap=tk.WORD, width=80, height=25)
     output_text.pack(padx=10, pady=10)
-    output_text.insert(tk.END, "Parts\n{\n")
-    
-    for entry in entries:
-        output_text.insert(tk.END, entry)
-    
-    output_text.insert(tk.END, "}\n")
 
-    if log:
-        log_label = tk.Label(output_window, text="Processing Log:")
-        log_label.pack(pady=(10,0))
-        log_text = scrolledtext.ScrolledText(output_window, wrap=tk.WORD, width=80, height=10)
-        log_text.pack(padx=10, pady=5)
-        log_text.insert(tk.END, log)
-        log_text.configure(state='disabled')
+    log_label = tk.Label(output_window, text="Processing Log:")
+    log_label.pack(pady=(10,0))
+    log_text = scrolledtext.ScrolledText(output_window, wrap=tk.WORD, width=80, height=10)
+    log_text.pack(padx=10, pady=5)
+    log_text.configure(state='disabled')
+
+    status_frame = tk.Frame(output_window)
+    status_frame.pack(pady=5)
+    status_label = tk.Label(status_frame, text="Scanning...")
+    status_label.pack(side=tk.LEFT, padx=5)
+    cancel = threading.Event()
+    cancel_button = tk.Button(status_frame, text="Cancel", command=cancel.set)
+    cancel_button.pack(side=tk.LEFT, padx=5)
 
     # Save buttons frame
     buttons_frame = tk.Frame(output_window)
     buttons_frame.pack(pady=10)
 
+    # Filled in once the scan is done; the text box and every save button share it
+    result = {'entries': None, 'content': None}
+
     save_buttons = {}
     for lang in LANGUAGES:
-        btn = tk.Button(buttons_frame, text=f"Save as {lang}.rules", 
-                        command=lambda l=lang, e=entries: save_to_file(e, l))
+        btn = tk.Button(buttons_frame, text=f"Save as {lang}.rules", state='disabled',
+                        command=lambda l=lang: save_to_file(result['entries'], result['content'], l))
         btn.pack(side=tk.LEFT, padx=2)
         save_buttons[lang] = btn
 
     # Save All button
-    save_all_button = tk.Button(output_window, text="Save All Languages", 
-                                command=lambda e=entries: save_all_languages(e))
+    parallel_var = tk.BooleanVar(value=False)
+    parallel_check = tk.Checkbutton(output_window, text="Write language files in parallel", variable=parallel_var)
+    parallel_check.pack()
+    save_all_button = tk.Button(output_window, text="Save All Languages", state='disabled',
+                                command=lambda: save_all_languages(result['entries'], result['content'], parallel_var.get()))
     save_all_button.pack(pady=5)
 
+    entries = []
+    by_file = {}  # Absolute file path -> its entries, so watched changes replace just that file's
+    results = queue.Queue()
+    changes = queue.Queue()
+    watch = {'watcher': None}
+
+    def close():
+        # Closing the window stops the scan and the watcher too
+        cancel.set()
+        if watch['watcher'] is not None:
+            watch['watcher'].stop()
+        output_window.destroy()
+
+    output_window.protocol("WM_DELETE_WINDOW", close)
+    threading.Thread(target=scan_rules_directory, args=(root_dir, results, cancel), daemon=True).start()
+
+    def finish(message):
+        cancel_button.pack_forget()
+        status_label.config(text=message)
+
+    def start_watching():
+        watch['watcher'] = RulesWatcher(root_dir, lambda changed, removed: changes.put((changed, removed)))
+        watch['watcher'].start()
+        output_window.after(WATCH_INTERVAL_MS, poll_changes)
+
+    def poll_changes():
+        """Re-parse the files the watcher reported and refresh the output if any entries changed."""
+        if not output_window.winfo_exists():
+            return
+        updated = 0
+        while True:
+            try:
+                changed, removed = changes.get_nowait()
+            except queue.Empty:
+                break
+            for file_path in removed:
+                updated += bool(by_file.pop(file_path, None))
+            for file_path in changed:
+                try:
+                    file_entries = process_rules_file(file_path)
+                except (OSError, UnicodeDecodeError) as e:
+                    logging.warning("Could not re-read changed file: %s (%s)", file_path, e)
+                    file_entries = []
+                if by_file.get(file_path, []) != file_entries:
+                    by_file[file_path] = file_entries
+                    updated += 1
+        if updated:
+            entries[:] = [part for file_entries in by_file.values() for part in file_entries]
+            result['content'] = render_strings_file(entries)
+            output_text.delete('1.0', tk.END)
+            output_text.insert(tk.END, result['content'])
+            status_label.config(text=f"Updated: {len(entries)} entries, {updated} changed files re-read")
+        output_window.after(WATCH_INTERVAL_MS, poll_changes)
+
+    def poll():
+        if not output_window.winfo_exists():
+            return
+        new_text = []
+        log_lines = []
+        outcome = None
+        while outcome is None:
+            try:
+                message = results.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'file':
+                _kind, file_path, file_entries = message
+                log_lines.append(f"Processing file: {file_path}\n")
+                by_file[os.path.abspath(file_path)] = file_entries
+                if file_entries:
+                    entries.extend(file_entries)
+                    new_text.extend(format_entry(part) for part in file_entries)
+                else:
+                    log_lines.append(f"Skipped file (missing keys): {file_path}\n")
+            else:
+                outcome = message
+
+        # One insert per batch instead of one per file keeps the widgets quick
+        if new_text:
+            output_text.insert(tk.END, ''.join(new_text))
+        if log_lines:
+            log_text.configure(state='normal')
+            log_text.insert(tk.END, ''.join(log_lines))
+            log_text.see(tk.END)
+            log_text.configure(state='disabled')
+
+        if outcome is None:
+            status_label.config(text=f"Scanning... {len(entries)} entries found")
+            output_window.after(POLL_INTERVAL_MS, poll)
+        elif outcome[0] == 'done':
+            if not entries:
+                output_window.destroy()
+                messagebox.showinfo("No Entries", "No valid entries found in the selected mod.rules file.")
+                return
+            # Replace the streamed text with the final, sorted file
+            result['entries'] = entries
+            result['content'] = render_strings_file(entries)
+            output_text.delete('1.0', tk.END)
+            output_text.insert(tk.END, result['content'])
+            for btn in list(save_buttons.values()) + [save_all_button]:
+                btn.config(state='normal')
+            _kind, stats, elapsed = outcome
+            finish(f"Done: {len(entries)} entries from {stats['files']} files ({stats['cached']} unchanged) in {elapsed:.1f}s")
+            start_watching()
+        elif outcome[0] == 'cancelled':
+            finish(f"Scan cancelled: {len(entries)} entries found so far, saving is disabled")
+        else:
+            finish("Scan failed")
+            messagebox.showerror("Error", f"Failed to scan the mod: {outcome[1]}")
+
+    output_window.after(POLL_INTERVAL_MS, poll)
+
 def get_strings_folder(root_dir):
     strings_folder = os.path.join(root_dir, 'strings')
     if not os.path.exists(strings_folder):
         os.makedirs(strings_folder)
     return strings_folder
 
-def save_to_file(entries, language):
+def sort_entries(entries):
+    return sorted(entries, key=lambda part: (part['id'], part['name_key']))
+
+def render_strings_file(entries, formatter=format_entry, presorted=False):
+    """Render a strings file in one buffer, with entries sorted by Part ID so reruns give identical files."""
+    buffer = io.StringIO()
+    buffer.write("Parts\n{\n")
+    buffer.writelines(formatter(part) for part in (entries if presorted else sort_entries(entries)))
+    buffer.write("}\n")
+    return buffer.getvalue()
+
+def render_outputs(entries, outputs):
+    """Render several StringsOutputs from the entries of a single scan. Returns {name: content}.
+
+    Entries are sorted once and shared by every output, so adding another view
+    of the same mod costs a filter and a render, not another scan.
+    """
+    entries = sort_entries(entries)
+    rendered = {}
+    for output in outputs:
+        selected = entries if output.id_filter is None else [part for part in entries if output.id_filter(part['id'])]
+        rendered[output.name] = render_strings_file(selected, output.formatter, presorted=True)
+    return rendered
+
+def generate_outputs(root_path, outputs):
+    """Scan root_path once and render every output. Returns (entries, {name: content})."""
+    entries = process_rules_directory(root_path)
+    return entries, render_outputs(entries, outputs)
+
+def find_parts_block(content):
+    """Return (keys, close_offset) for the top-level Parts { } block of a strings file, or None.
+
+    keys holds the lower-cased keys defined directly in the block; close_offset
+    is where its closing brace is.
+    """
+    depth = 0
+    in_parts = False
+    parts_depth = None
+    keys = set()
+    for match in STRINGS_TOKEN_PATTERN.finditer(content):
+        token = match.group(0)
+        if token[0] in '/"':
+            continue
+        if token == '{':
+            depth += 1
+            if in_parts and parts_depth is None:
+                parts_depth = depth
+        elif token == '}':
+            if parts_depth is not None and depth == parts_depth:
+                return keys, match.start()
+            depth -= 1
+        elif parts_depth is None:
+            in_parts = depth == 0 and token.lower() == 'parts'
+        elif depth == parts_depth and match.group('key'):
+            keys.add(match.group('key').lower())
+    return None
+
+def merge_strings_file(existing, entries):
+    """Add the strings of entries that existing doesn't have yet, leaving everything else as it is.
+
+    Existing keys keep their (translated) values; new ones are appended to the
+    end of the Parts block, sorted by Part ID, with the file's own line endings.
+    Returns existing unchanged if there is nothing to add.
+    """
+    newline = '\r\n' if '\r\n' in existing else '\n'
+    block = find_parts_block(existing)
+    known = set(block[0]) if block else set()
+
+    added = []
+    for part in sort_entries(entries):
+        missing = [(key, tabs) for key, tabs in part_strings(part) if key.lower() not in known]
+        if missing:
+            known.update(key.lower() for key, _tabs in missing)
+            added.append(format_entry(part, missing))
+    if not added:
+        return existing
+
+    text = ''.join(added)
+    if block:
+        close = block[1]
+        if not existing.endswith('\n', 0, close):
+            text = '\n' + text
+        merged = existing[:close] + text.replace('\n', newline) + existing[close:]
+    else:
+        prefix = '' if not existing or existing.endswith('\n') else newline
+        merged = existing + prefix + ("Parts\n{\n" + text + "}\n").replace('\n', newline)
+    return merged
+
+def write_file_atomic(file_path, data):
+    """Write bytes through a temp file and swap it into place."""
+    tmp_path = file_path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_if_changed(file_path, data):
+    """Write bytes only if the file doesn't already hold exactly them. Returns 'created', 'updated' or 'unchanged'."""
+    try:
+        with open(file_path, 'rb') as file:
+            if file.read() == data:
+                return 'unchanged'
+        status = 'updated'
+    except FileNotFoundError:
+        status = 'created'
+    write_file_atomic(file_path, data)
+    return status
+
+def _run_writes(write, file_paths, parallel):
+    def run(file_path):
+        try:
+            return file_path, write(file_path), None
+        except (OSError, UnicodeDecodeError) as e:
+            return file_path, None, e
+
+    if parallel and len(file_paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), MAX_WORKERS)) as executor:
+            return list(executor.map(run, file_paths))
+    return [run(file_path) for file_path in file_paths]
+
+def write_strings_files(content, file_paths, parallel=False):
+    """Write the same rendered content to every path, optionally on a thread pool.
+
+    The content is encoded once and the same bytes go to every file; files that
+    already match are left untouched. Returns a list of (file_path, status, error).
+    """
+    # Match what text mode would write on this platform
+    data = content.replace('\n', os.linesep).encode('utf-8')
+    return _run_writes(lambda file_path: write_if_changed(file_path, data), file_paths, parallel)
+
+def merge_strings_files(entries, file_paths, parallel=False):
+    """Merge new keys into existing language files. Returns a list of (file_path, status, error)."""
+    def merge(file_path):
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            existing = file.read()
+        merged = merge_strings_file(existing, entries)
+        if merged == existing:
+            return 'unchanged'
+        write_file_atomic(file_path, merged.encode('utf-8'))
+        return 'updated'
+
+    return _run_writes(merge, file_paths, parallel)
+
+def show_write_results(results):
+    """Summarise per-file results from write_strings_files or merge_strings_files."""
+    lines = [f"{os.path.basename(path)}: {status}" for path, status, error in results if not error]
+    failed = [f"{os.path.basename(path)}: {error}" for path, status, error in results if error]
+    if failed:
+        messagebox.showerror("Error", "Failed to save:\n" + "\n".join(failed))
+    if lines:
+        messagebox.showinfo("Success", "Files saved:\n" + "\n".join(lines))
+
+def ask_save_as(strings_folder, language):
+    return filedialog.asksaveasfilename(
+        title=f"Save {language}.rules As",
+        defaultextension=".rules",
+        filetypes=[("Rules files", "*.rules")],
+        initialdir=strings_folder,
+        initialfile=language
+    )
+
+def save_to_file(entries, content, language):
     config = load_config()
     root_dir = config.get('root_dir')
     if not root_dir:
@@ -171,31 +772,24 @@ def save_to_file(entries, language):
     file_path = os.path.join(strings_folder, file_name)
 
     if os.path.exists(file_path):
-        result = messagebox.askyesno("File Exists", 
-                                     f"{file_name} already exists. Do you want to save it as a different name?")
-        if not result:
+        result = messagebox.askyesnocancel(
+            "File Exists",
+            f"{file_name} already exists.\n\n"
+            "Yes: add only the new keys to it, keeping existing translations.\n"
+            "No: save as a different file."
+        )
+        if result is None:
+            return
+        if result:
+            show_write_results(merge_strings_files(entries, [file_path]))
+            return
+        file_path = ask_save_as(strings_folder, language)
+        if not file_path:
             return
-        else:
-            new_file_name = filedialog.asksaveasfilename(
-                title="Save As",
-                defaultextension=".rules",
-                filetypes=[("Rules files", "*.rules")],
-                initialdir=strings_folder
-            )
-            if not new_file_name:
-                return
-            file_path = new_file_name
-
-    content = "Parts\n{\n"
-    for entry in entries:
-        content += entry
-    content += "}\n"
 
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(content)
-    messagebox.showinfo("Success", f"File saved successfully as {os.path.basename(file_path)}!")
+    show_write_results(write_strings_files(content, [file_path]))
 
-def save_all_languages(entries):
+def save_all_languages(entries, content, parallel=False):
     config = load_config()
     root_dir = config.get('root_dir')
     if not root_dir:
@@ -203,35 +797,38 @@ def save_all_languages(entries):
         return
 
     strings_folder = get_strings_folder(root_dir)
-    for language in LANGUAGES:
-        file_name = f"{language}.rules"
-        file_path = os.path.join(strings_folder, file_name)
-
-        if os.path.exists(file_path):
-            result = messagebox.askyesno("File Exists", 
-                                         f"{file_name} already exists. Do you want to save it as a different name?")
-            if not result:
-                continue
-            else:
-                new_file_name = filedialog.asksaveasfilename(
-                    title=f"Save {language}.rules As",
-                    defaultextension=".rules",
-                    filetypes=[("Rules files", "*.rules")],
-                    initialdir=strings_folder,
-                    initialfile=language
-                )
-                if not new_file_name:
-                    continue
-                file_path = new_file_name
-
-        content = "Parts\n{\n"
-        for entry in entries:
-            content += entry
-        content += "}\n"
+    file_paths = {language: os.path.join(strings_folder, f"{language}.rules") for language in LANGUAGES}
+    existing = [language for language, path in file_paths.items() if os.path.exists(path)]
+
+    merge = False
+    if existing:
+        result = messagebox.askyesnocancel(
+            "Files Exist",
+            f"{', '.join(language + '.rules' for language in existing)} already exist.\n\n"
+            "Yes: add only the new keys to them, keeping existing translations.\n"
+            "No: choose a different file for each."
+        )
+        if result is None:
+            return
+        merge = result
+
+    # Ask about every existing file first, then write all the chosen paths in one go
+    new_paths = []
+    merge_paths = []
+    for language, file_path in file_paths.items():
+        if language not in existing:
+            new_paths.append(file_path)
+        elif merge:
+            merge_paths.append(file_path)
+        else:
+            new_file_name = ask_save_as(strings_folder, language)
+            if new_file_name:
+                new_paths.append(new_file_name)
 
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(content)
-        messagebox.showinfo("Success", f"File saved successfully as {os.path.basename(file_path)}!")
+    results = write_strings_files(content, new_paths, parallel) if new_paths else []
+    if merge_paths:
+        results += merge_strings_files(entries, merge_paths, parallel)
+    show_write_results(results)
 
 def create_ui():
     root = tk.Tk()
@@ -248,11 +845,12 @@ def create_ui():
     config = load_config()
     if 'root_dir' in config:
         load_button = tk.Button(root, text="Load from Config", 
-                                command=lambda: display_output(process_rules_directory(config['root_dir'])))
+                                command=lambda: display_output(config['root_dir']))
         load_button.pack(pady=5)
 
     root.mainloop()
 
 # Run the UI
 if __name__ == "__main__":
+    setup_logging()
     create_ui()
@@ -1,68 +1,34 @@
-import os
-import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 
-# Function to process each rules file and extract NameKey and IconNameKey
-def process_rules_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+from strings_generator import (
+    StringsOutput, format_entry_names_only, generate_outputs, id_prefix_filter, setup_logging
+)
 
-    # Find ID, NameKey, and IconNameKey
-    id_match = re.search(r'ID\s*=\s*(SW\.[^\s]+)', content)
-    name_key_match = re.search(r'NameKey\s*=\s*"([^"]+)"', content)
-    icon_key_match = re.search(r'IconNameKey\s*=\s*"([^"]+)"', content)
-
-    entries = []
-
-    if id_match and name_key_match and icon_key_match:
-        id_value = id_match.group(1)
-        name_key = name_key_match.group(1)
-        icon_key = icon_key_match.group(1)
-
-        # Format the output with a comment for the ID and proper spacing
-        entry = (f'\n\t// {id_value}\n'
-                 f'\t{name_key.split("/")[-1]}\t\t\t= "{name_key.split("/")[-1]}"\n'
-                 f'\t{icon_key.split("/")[-1]}\t\t= "{icon_key.split("/")[-1]}"\n')
-
-        entries.append(entry)
-
-    return entries
-
-# Function to process all .rules files in a selected directory and generate output
-def process_rules_directory(directory_path):
-    entries = []
-    for root, _, files in os.walk(directory_path):
-        for file_name in files:
-            if file_name.endswith('.rules'):
-                file_path = os.path.join(root, file_name)
-                entries += process_rules_file(file_path)
-
-    return entries
+# Only Parts with this ID prefix are listed
+ID_PREFIX = 'SW.'
+EN_OUTPUT = StringsOutput('en', id_prefix_filter(ID_PREFIX), format_entry_names_only)
 
 # Function to open directory dialog
 def select_directory():
     directory_path = filedialog.askdirectory()
     if directory_path:
-        entries = process_rules_directory(directory_path)
-        if entries:
-            display_output(entries)
+        entries, rendered = generate_outputs(directory_path, [EN_OUTPUT])
+        if any(EN_OUTPUT.id_filter(part['id']) for part in entries):
+            display_output(rendered[EN_OUTPUT.name])
+        else:
+            messagebox.showinfo("No Entries", f"No {ID_PREFIX} Parts found in the selected folder.")
 
 # Function to display the output in a scrollable text box
-def display_output(entries):
+def display_output(content):
     output_window = tk.Toplevel()
     output_window.title("Generated .rules Entries")
 
     output_text = scrolledtext.ScrolledText(output_window, wrap=tk.WORD, width=80, height=25)
     output_text.pack(padx=10, pady=10)
-    output_text.insert(tk.END, "Parts\n{\n")
-    
-    for entry in entries:
-        output_text.insert(tk.END, entry)
-    
-    output_text.insert(tk.END, "}\n")
+    output_text.insert(tk.END, content)
 
-    save_button = tk.Button(output_window, text="Save to File", command=lambda: save_to_file(output_text.get("1.0", tk.END)))
+    save_button = tk.Button(output_window, text="Save to File", command=lambda: save_to_file(output_text.get("1.0", "end-1c")))
     save_button.pack(pady=10)
 
 # Function to save the generated output to a file
@@ -88,4 +54,6 @@ def create_ui():
     root.mainloop()
 
 # Run the UI
-create_ui()
+if __name__ == "__main__":
+    setup_logging()
+    create_ui()
@@ -0,0 +1,224 @@
+"""Batch translation of strings values with a persistent translation memory.
+
+Every translated string is kept in translation_memory.json (next to
+config.json), keyed by source text and target language, so running the
+translation again only sends strings that are new or whose English text
+changed. Requests go out in batches, with a bounded number in flight.
+
+Inline syntax that must survive translation untouched - {0}-style fields,
+&<file.rules>/Path references and backslash escapes - is swapped for
+numbered placeholders before a string is sent and swapped back afterwards.
+
+Backends:
+    IdentityBackend     returns every string as-is (optionally tagged); for testing
+    DictionaryBackend   looks strings up in a JSON file, fully offline
+    GoogleTransBackend  googletrans, if it is installed
+"""
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import logging
+import os
+import re
+
+from strings_generator import CONFIG_FILE, write_file_atomic
+
+try:
+    from googletrans import Translator
+except ImportError:
+    Translator = None
+
+MEMORY_FILE = 'translation_memory.json'
+BATCH_SIZE = 50
+# Batches in flight at once, per run
+MAX_CONCURRENT_BATCHES = 4
+
+# {field}, &<file.rules>/Path/To/Field and backslash escapes like \n or \"
+PROTECTED_PATTERN = re.compile(r'\{[^{}\n]*\}|&<[^<>\n]*>(?:/[^\s/\\"{}\[\],;]+)*|\\.')
+PLACEHOLDER = '⟦{}⟧'  # ⟦0⟧, which translators leave alone
+PLACEHOLDER_PATTERN = re.compile('⟦(\\d+)⟧')
+
+
+def protect(text):
+    """Replace inline syntax with numbered placeholders. Returns (masked text, originals)."""
+    originals = []
+
+    def swap(match):
+        originals.append(match.group(0))
+        return PLACEHOLDER.format(len(originals) - 1)
+
+    return PROTECTED_PATTERN.sub(swap, text), originals
+
+
+def restore(text, originals):
+    """Put protected syntax back. Returns None if the translation lost or invented a placeholder."""
+    found = PLACEHOLDER_PATTERN.findall(text)
+    if sorted(int(index) for index in found) != list(range(len(originals))):
+        return None
+    return PLACEHOLDER_PATTERN.sub(lambda match: originals[int(match.group(1))], text)
+
+
+class TranslationBackend(ABC):
+    """Translates a batch of strings into one language.
+
+    Subclasses implement translate_batch; it may block, since it runs on a
+    worker thread, and must return one string per input, in order, or None for
+    strings it can't translate (those are not remembered and are retried).
+    """
+    batch_size = BATCH_SIZE
+
+    @abstractmethod
+    def translate_batch(self, texts, language):
+        """Return the translations of texts into language, one per text, None where it failed."""
+
+
+class IdentityBackend(TranslationBackend):
+    """Local stand-in that 'translates' by returning the text, with an optional tag like '[de] '."""
+
+    def __init__(self, tag=False):
+        self.tag = tag
+        self.calls = 0
+
+    def translate_batch(self, texts, language):
+        self.calls += 1
+        return [f"[{language}] {text}" if self.tag else text for text in texts]
+
+
+class DictionaryBackend(TranslationBackend):
+    """Offline backend reading {language: {source text: translation}} from a JSON file.
+
+    Strings the dictionary doesn't have are left untranslated, so adding them
+    to the file later picks them up on the next run.
+    """
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            self.dictionary = json.load(f)
+
+    def translate_batch(self, texts, language):
+        translations = self.dictionary.get(language, {})
+        return [translations.get(text) for text in texts]
+
+
+class GoogleTransBackend(TranslationBackend):
+    def __init__(self):
+        if Translator is None:
+            raise RuntimeError("googletrans is not installed (pip install googletrans==4.0.0-rc1)")
+        self.translator = Translator()
+
+    def translate_batch(self, texts, language):
+        return [result.text for result in self.translator.translate(list(texts), dest=language)]
+
+
+def create_backend(config):
+    """Build the backend named by "translation_backend" in config.json (googletrans by default)."""
+    name = config.get('translation_backend', 'googletrans')
+    if name == 'dictionary':
+        if not config.get('translation_dictionary'):
+            raise ValueError(f"translation_backend 'dictionary' needs a translation_dictionary path in {CONFIG_FILE}")
+        return DictionaryBackend(config['translation_dictionary'])
+    if name == 'identity':
+        return IdentityBackend()
+    if name == 'googletrans':
+        return GoogleTransBackend()
+    raise ValueError(f"Unknown translation_backend {name!r} in {CONFIG_FILE}")
+
+
+class TranslationMemory:
+    """Translations keyed by (source text, language), stored as JSON {language: {source: translation}}."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), MEMORY_FILE)
+        self.translations = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.translations = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Could not read translation memory %s (%s), starting empty", self.path, e)
+
+    def get(self, text, language):
+        return self.translations.get(language, {}).get(text)
+
+    def put(self, text, language, translation):
+        self.translations.setdefault(language, {})[text] = translation
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = json.dumps(self.translations, ensure_ascii=False, indent=1, sort_keys=True)
+        write_file_atomic(self.path, data.encode('utf-8'))
+        self.dirty = False
+
+
+async def _translate_batch(backend, batch, language, semaphore):
+    masked = []
+    originals = []
+    for text in batch:
+        masked_text, protected = protect(text)
+        masked.append(masked_text)
+        originals.append(protected)
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        try:
+            translated = await loop.run_in_executor(None, backend.translate_batch, masked, language)
+        except Exception as e:
+            logging.warning("Translation into %s failed for %d strings: %s", language, len(batch), e)
+            return {}
+    if len(translated) != len(batch):
+        logging.warning("Translation into %s returned %d strings for %d", language, len(translated), len(batch))
+        return {}
+
+    results = {}
+    for text, translation, protected in zip(batch, translated, originals):
+        if translation is None:
+            continue
+        restored = restore(translation, protected)
+        if restored is None:
+            logging.warning("Translation into %s mangled inline syntax, keeping the source: %r", language, text)
+        else:
+            results[text] = restored
+    return results
+
+
+async def translate_async(texts, languages, backend, memory, concurrency=MAX_CONCURRENT_BATCHES):
+    """Translate texts into every language, asking the backend only for what memory doesn't have.
+
+    Returns {language: {text: translation}}. Strings that fail to translate
+    map to themselves and are not remembered, so the next run retries them.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    unique = list(dict.fromkeys(texts))
+    jobs = []
+    for language in languages:
+        missing = [text for text in unique if memory.get(text, language) is None]
+        for start in range(0, len(missing), backend.batch_size):
+            batch = missing[start:start + backend.batch_size]
+            jobs.append((language, _translate_batch(backend, batch, language, semaphore)))
+
+    for (language, _job), batch_results in zip(jobs, await asyncio.gather(*(job for _language, job in jobs))):
+        for text, translation in batch_results.items():
+            memory.put(text, language, translation)
+
+    results = {}
+    for language in languages:
+        results[language] = {}
+        for text in unique:
+            translation = memory.get(text, language)
+            results[language][text] = text if translation is None else translation
+    return results
+
+
+def translate_texts(texts, languages, backend, memory=None, concurrency=MAX_CONCURRENT_BATCHES):
+    """Blocking wrapper around translate_async that also saves the memory afterwards."""
+    if memory is None:
+        memory = TranslationMemory()
+    results = asyncio.run(translate_async(texts, languages, backend, memory, concurrency))
+    try:
+        memory.save()
+    except OSError as e:
+        logging.warning("Could not save translation memory %s (%s)", memory.path, e)
+    return results
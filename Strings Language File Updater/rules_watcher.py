@@ -0,0 +1,129 @@
+import os
+import threading
+
+# watchdog gives native change events (inotify, ReadDirectoryChangesW, FSEvents); fall back to polling without it
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def snapshot_rules_files(root, suffix='.rules'):
+    """Map every matching file below root to its (mtime_ns, size)."""
+    snapshot = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(suffix):
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return snapshot
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == 'moved':
+            self.watcher._record(event.src_path, removed=True)
+            self.watcher._record(event.dest_path, removed=False)
+        elif event.event_type == 'deleted':
+            self.watcher._record(event.src_path, removed=True)
+        elif event.event_type in ('created', 'modified', 'closed'):
+            self.watcher._record(event.src_path, removed=False)
+
+
+class RulesWatcher:
+    """Watch a mod directory and report changed or removed .rules files.
+
+    The callback receives (changed_paths, removed_paths) as two sets. It is called
+    from the watcher thread, at most once per interval, so GUI callers should hand
+    the result to their main loop (e.g. through a queue polled with after()).
+    """
+
+    def __init__(self, root, callback, interval=1.0, suffix='.rules', use_native=True):
+        self.root = os.path.abspath(root)
+        self.callback = callback
+        self.interval = interval
+        self.suffix = suffix
+        self.use_native = use_native and Observer is not None
+        self._lock = threading.Lock()
+        self._changed = set()
+        self._removed = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self._snapshot = None
+
+    @property
+    def mode(self):
+        return 'native' if self.use_native else 'polling'
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.use_native:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.root, recursive=True)
+            self._observer.start()
+        else:
+            self._snapshot = snapshot_rules_files(self.root, self.suffix)
+        self._thread = threading.Thread(target=self._run, name="RulesWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _record(self, path, removed):
+        if not path.endswith(self.suffix):
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            if removed:
+                self._changed.discard(path)
+                self._removed.add(path)
+            else:
+                self._removed.discard(path)
+                self._changed.add(path)
+
+    def _poll(self):
+        current = snapshot_rules_files(self.root, self.suffix)
+        for path, stat in current.items():
+            if self._snapshot.get(path) != stat:
+                self._record(path, removed=False)
+        for path in self._snapshot.keys() - current.keys():
+            self._record(path, removed=True)
+        self._snapshot = current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.use_native:
+                self._poll()
+            with self._lock:
+                changed, removed = self._changed, self._removed
+                self._changed, self._removed = set(), set()
+            if changed or removed:
+                self.callback(changed, removed)
@@ -0,0 +1,320 @@
+"""Parse Cosmoteer strings .rules files into a token stream and a fullkey -> value map.
+
+Base templates and target language files go through the same single-pass
+parser: the base keeps the token stream to regenerate files from, targets
+only need the map. Regenerated files are written atomically, and only when
+their content changed.
+
+Run directly to sync a strings folder without the GUI:
+    python strings_sync.py path/to/strings --base en.rules
+    python strings_sync.py path/to/strings --base en.rules --check   # exit code 1 if out of sync
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# matches lines like "Key = \"Value\"" (no semicolon)
+KV_PATTERN = re.compile(
+    r'^\s*'                # leading whitespace
+    r'(?P<key>[^\s=]+)'    # key (no spaces or =)
+    r'\s*=\s*'            # equals sign
+    r'(?P<value>.+?)'       # value (lazy up to end)
+    r'\s*$'                # trailing whitespace/end
+)
+# Start of a trailing // or /* comment
+COMMENT_PATTERN = re.compile(r'//|/\*')
+# Language files written at once when applying
+WRITE_WORKERS = 8
+
+
+def _strip_comment(text):
+    match = COMMENT_PATTERN.search(text)
+    return (text[:match.start()] if match else text).strip()
+
+
+def parse_strings(lines, keep_tokens=True):
+    """Parse the lines of a strings file. Returns (tokens, mapping).
+
+    tokens: ('blank', raw) ('comment', raw) ('section_start', raw) ('section_end', raw) ('kv', indent, key, fullkey),
+    or an empty list if keep_tokens is False.
+    mapping: fullkey -> value, where fullkey is the key prefixed by its section names, e.g. "Parts.TestLaser".
+    """
+    tokens = []
+    mapping = {}
+    add = tokens.append if keep_tokens else (lambda token: None)
+    stack = []
+    pending = None  # Section name on the line before a bare '{'
+    for line in lines:
+        raw = line.rstrip('\r\n')
+        stripped = raw.lstrip()
+        # blank
+        if not stripped:
+            pending = None; add(('blank', raw)); continue
+        # comment
+        if stripped.startswith(('//', '/*')):
+            pending = None; add(('comment', raw)); continue
+        # inline section with brace
+        if stripped.endswith('{') and stripped != '{':
+            stack.append(_strip_comment(stripped[:-1])); pending = None; add(('section_start', raw)); continue
+        # bare brace
+        if stripped == '{':
+            stack.append(_strip_comment(pending) if pending else ''); pending = None; add(('section_start', raw)); continue
+        # section end
+        if stripped in ('}', '};'):
+            pending = None
+            if stack: stack.pop()
+            add(('section_end', raw)); continue
+        # section name line (before brace)
+        if '=' not in stripped:
+            pending = stripped
+            add(('comment', raw)); continue
+        # key/value
+        m = KV_PATTERN.match(raw)
+        if m:
+            pending = None
+            key = m.group('key')
+            fullkey = '.'.join([s for s in stack if s] + [key])
+            add(('kv', raw[:len(raw) - len(stripped)], key, fullkey))
+            mapping[fullkey] = m.group('value').strip()
+        else:
+            pending = None; add(('comment', raw))
+    return tokens, mapping
+
+
+def load_strings_file(path, keep_tokens=True):
+    """Parse a strings file from disk. Returns (tokens, mapping); see parse_strings."""
+    with open(path, encoding='utf-8') as f:
+        return parse_strings(f, keep_tokens)
+
+
+LanguagePreview = namedtuple('LanguagePreview', 'content new_keys removed_keys changed_keys removed_values')
+LanguagePreview.__doc__ = """A language file regenerated from a StringsTemplate.
+
+new_keys: base keys the file didn't have (they get the base value), in base order.
+removed_keys: keys only the file had, which regeneration drops, in file order.
+changed_keys: keys whose value in the file differs from the base value, in base order.
+removed_values: fullkey -> the file's value for each removed key.
+"""
+
+
+class StringsTemplate:
+    """A parsed base file, with its keys in order and the line each one renders to.
+
+    Every token renders to exactly one line, so key_lines is the same for all
+    languages generated from this template and is worked out once.
+    """
+
+    def __init__(self, tokens, values):
+        self.tokens = tokens
+        self.values = values  # fullkey -> base value
+        self.keys = []  # fullkeys in file order
+        self.key_lines = {}  # fullkey -> line number in rendered content
+        for line, token in enumerate(tokens):
+            if token[0] == 'kv':
+                self.keys.append(token[3])
+                self.key_lines[token[3]] = line
+        self.key_set = frozenset(self.keys)
+
+    @classmethod
+    def load(cls, path):
+        return cls(*load_strings_file(path))
+
+    def render(self, target_map):
+        """Regenerate a language file from the base tokens, keeping the target's values.
+
+        Keys the target doesn't have get the base value. The new, removed and
+        changed keys are collected in the same pass. Returns a LanguagePreview.
+        """
+        lines = []
+        new_keys = []
+        changed_keys = []
+        for token in self.tokens:
+            if token[0] != 'kv':
+                lines.append(token[1])
+                continue
+            _, indent, key, fullkey = token
+            base_value = self.values[fullkey]
+            val = target_map.get(fullkey)
+            if val is None:
+                new_keys.append(fullkey)
+                val = base_value
+            elif val != base_value:
+                changed_keys.append(fullkey)
+            lines.append(f"{indent}{key} = {val}")
+        key_set = self.key_set
+        removed_values = {fullkey: val for fullkey, val in target_map.items() if fullkey not in key_set}
+        return LanguagePreview("\n".join(lines), new_keys, list(removed_values), changed_keys, removed_values)
+
+
+def preview_language(path, template):
+    """Parse one language file and regenerate it from the template. Returns a LanguagePreview.
+
+    Safe to run on a worker thread; a missing file previews as all base values.
+    """
+    target_map = load_strings_file(path, keep_tokens=False)[1] if os.path.isfile(path) else {}
+    return template.render(target_map)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def file_newline(path):
+    """The line ending a file already uses; os.linesep for new or single-line files."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(1 << 16)
+    except FileNotFoundError:
+        return os.linesep
+    if b'\r\n' in head:
+        return '\r\n'
+    return '\n' if b'\n' in head else os.linesep
+
+
+def encode_language_file(text, newline=os.linesep):
+    return text.replace('\n', newline).encode('utf-8')
+
+
+def file_matches(path, data):
+    """True if the file at path holds exactly data; the size is checked before hashing."""
+    try:
+        return os.path.getsize(path) == len(data) and _file_digest(path) == hashlib.sha256(data).digest()
+    except FileNotFoundError:
+        return False
+
+
+def _backup(path):
+    """Keep the current file as path.backup, as a hard link to it when the filesystem allows."""
+    backup = path + '.backup'
+    tmp_backup = backup + '.tmp'
+    try:
+        try:
+            os.link(path, tmp_backup)
+        except OSError:
+            shutil.copy2(path, tmp_backup)
+        os.replace(tmp_backup, backup)
+    except BaseException:
+        if os.path.exists(tmp_backup):
+            os.remove(tmp_backup)
+        raise
+
+
+def write_language_file(path, text, backup=True):
+    """Write a regenerated language file if its content changed. Returns 'created', 'updated' or 'unchanged'.
+
+    The new text goes to a temp file that replaces the original in one step, so
+    a crash never leaves a half-written file. The replaced file is kept as
+    path.backup; a hard link costs no copy, since the new file gets a new inode.
+    """
+    # Keep the file's own line endings, so results don't depend on the platform
+    data = encode_language_file(text, file_newline(path))
+    exists = os.path.isfile(path)
+    if exists and file_matches(path, data):
+        return 'unchanged'
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        if exists and backup:
+            _backup(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return 'updated' if exists else 'created'
+
+
+def write_language_files(files, backup=True, workers=WRITE_WORKERS):
+    """Write {path: text} concurrently. Returns a list of (path, status, error), one per file, in input order."""
+    def run(item):
+        path, text = item
+        try:
+            return path, write_language_file(path, text, backup), None
+        except OSError as e:
+            return path, None, e
+
+    items = list(files.items())
+    if len(items) < 2:
+        return [run(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), workers)) as executor:
+        return list(executor.map(run, items))
+
+
+def sync_directory(directory, base_name, languages=None, check=False, backup=True, jobs=WRITE_WORKERS):
+    """Regenerate every language file in directory from base_name.
+
+    languages defaults to every .rules file except the base. With check, nothing
+    is written. Returns a list of (path, status, preview, error), where status
+    is 'in sync' / 'out of sync' when checking, else 'created' / 'updated' / 'unchanged'.
+    """
+    template = StringsTemplate.load(os.path.join(directory, base_name))
+    # Real file names by language code, so DE.RULES is updated in place rather than next to a new de.rules
+    existing = {
+        fname[:-6].lower(): fname for fname in os.listdir(directory)
+        if fname.lower().endswith('.rules') and fname.lower() != base_name.lower()
+    }
+    if languages is None:
+        names = sorted(existing.values())
+    else:
+        names = [existing.get(code.lower(), f"{code}.rules") for code in languages]
+    paths = [os.path.join(directory, name) for name in names]
+
+    def run(path):
+        try:
+            preview = preview_language(path, template)
+            if check:
+                data = encode_language_file(preview.content, file_newline(path))
+                status = 'in sync' if file_matches(path, data) else 'out of sync'
+            else:
+                status = write_language_file(path, preview.content, backup)
+            return path, status, preview, None
+        except (OSError, UnicodeDecodeError) as e:
+            return path, None, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(paths), jobs))) as executor:
+        return list(executor.map(run, paths))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync Cosmoteer language .rules files with a base file.")
+    parser.add_argument('directory', help="Strings folder holding the language .rules files")
+    parser.add_argument('--base', default='en.rules', help="Base file name in the folder (default: en.rules)")
+    parser.add_argument('--languages', nargs='+', metavar='CODE', help="Language codes to sync (default: every other .rules file)")
+    parser.add_argument('--check', action='store_true', help="Only report files that are out of sync; exit with 1 if any are")
+    parser.add_argument('--jobs', type=int, default=WRITE_WORKERS, help="Language files to process in parallel")
+    parser.add_argument('--no-backup', action='store_true', help="Don't keep .rules.backup copies of updated files")
+    args = parser.parse_args(argv)
+
+    try:
+        results = sync_directory(args.directory, args.base, args.languages, args.check, not args.no_backup, args.jobs)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: could not read base file: {e}", file=sys.stderr)
+        return 2
+
+    failed = False
+    out_of_sync = False
+    for path, status, preview, error in results:
+        name = os.path.basename(path)
+        if error:
+            failed = True
+            print(f"Error: {name}: {error}", file=sys.stderr)
+            continue
+        out_of_sync = out_of_sync or status == 'out of sync'
+        print(f"{name}: {status} ({len(preview.new_keys)} new, {len(preview.removed_keys)} removed)")
+    if failed:
+        return 2
+    return 1 if out_of_sync else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,19 +5,19 @@ import os
 # Force qtpy to use PySide6, suppress binding warnings
 os.environ['QT_API'] = 'pyside6'
 
-import shutil
-import re
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QComboBox, QPushButton, QFileDialog,
     QMessageBox, QCheckBox, QScrollArea,
     QTabWidget, QPlainTextEdit, QSplitter,
-    QListWidget, QListWidgetItem
+    QListView
 )
 from PySide6.QtGui import QTextCursor
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QStringListModel
 
 # Attempt to apply a dark style if available
 try:
@@ -30,13 +30,20 @@ try:
 except ImportError:
     pyi_splash = None
 
-# matches lines like "Key = \"Value\"" (no semicolon)
-KV_PATTERN = re.compile(
-    r'^\s*'                # leading whitespace
-    r'(?P<key>[^\s=]+)'    # key (no spaces or =)
-    r'\s*=\s*'            # equals sign
-    r'(?P<value>.+?)'       # value (lazy up to end)
-    r'\s*$'                # trailing whitespace/end
+from rules_watcher import RulesWatcher
+from strings_sync import KV_PATTERN, StringsTemplate, preview_language, write_language_files
+
+# Language files parsed and regenerated at once during preview
+PREVIEW_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+# How often finished previews are picked up, in milliseconds
+PREVIEW_POLL_MS = 30
+# How often changes reported by the watcher are picked up, in milliseconds
+WATCH_POLL_MS = 250
+# Key lists shown next to each preview: (LanguagePreview field, label)
+KEY_VIEWS = (
+    ('new_keys', "New Keys"),
+    ('changed_keys', "Changed Keys"),
+    ('removed_keys', "Removed Keys"),
 )
 
 class RulesLocalizationTool(QMainWindow):
@@ -44,16 +51,29 @@ class RulesLocalizationTool(QMainWindow):
         super().__init__()
         self.setWindowTitle("Rules Localization Tool")
         self.resize(1000, 700)
-        # tokens: (‘blank’, raw) (‘comment’, raw) (‘section_start’, raw) (‘section_end’, raw) (‘kv’, indent, key, fullkey)
-        self.base_tokens = []
-        # fullkey -> base value
-        self.base_map = {}
+        # Parsed base file (StringsTemplate), or None
+        self.base = None
         self.language_checkboxes = {}
+        # Widgets of the tabs built so far; preview_pages has every tab, built or not
+        self.preview_pages = {}
         self.preview_editors = {}
         self.preview_lists = {}
-        self.preview_line_maps = {}
+        # code -> LanguagePreview, all rendered from preview_base
+        self.previews = {}
+        self.preview_base = None
         self.copy_buttons = {}
         self.selected_keys = {}
+        # Running preview: list of (code, future), polled by _preview_timer
+        self.preview_jobs = []
+        # Codes of the running or last preview, in checkbox order
+        self.preview_order = []
+        self._preview_timer = QTimer(self)
+        self._preview_timer.timeout.connect(self._collect_previews)
+        # Watches the strings directory; the watcher thread queues (changed, removed) for _watch_timer
+        self.watcher = None
+        self.watch_queue = queue.SimpleQueue()
+        self._watch_timer = QTimer(self)
+        self._watch_timer.timeout.connect(self._collect_changes)
         self._build_ui()
 
     def _build_ui(self):
@@ -66,9 +86,9 @@ class RulesLocalizationTool(QMainWindow):
         dir_layout.addWidget(QLabel("Strings Directory:"))
         self.dir_edit = QLineEdit()
         dir_layout.addWidget(self.dir_edit, 1)
-        btn_dir = QPushButton("Browse…")
-        btn_dir.clicked.connect(self._select_directory)
-        dir_layout.addWidget(btn_dir)
+        self.btn_dir = QPushButton("Browse…")
+        self.btn_dir.clicked.connect(self._select_directory)
+        dir_layout.addWidget(self.btn_dir)
         layout.addLayout(dir_layout)
 
         # Base file selector
@@ -97,6 +117,7 @@ class RulesLocalizationTool(QMainWindow):
 
         # Preview tabs
         self.tabs = QTabWidget(); layout.addWidget(self.tabs, 3)
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
     def _select_directory(self):
         path = QFileDialog.getExistingDirectory(self, "Select Strings Directory")
@@ -104,6 +125,71 @@ class RulesLocalizationTool(QMainWindow):
             self.dir_edit.setText(path)
             self._populate_base_combo(path)
             self._populate_language_list(path)
+            self._start_watcher(path)
+
+    def _start_watcher(self, directory):
+        self._stop_watcher()
+        self.watcher = RulesWatcher(directory, lambda changed, removed: self.watch_queue.put((changed, removed)))
+        self.watcher.start()
+        self._watch_timer.start(WATCH_POLL_MS)
+
+    def _stop_watcher(self):
+        self._watch_timer.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _collect_changes(self):
+        """Pick up language files changed on disk: refresh the file lists, the base and the previews.
+
+        Previews are regenerated right away unless an opened tab was edited; then
+        the affected tabs are only marked, so no edits are lost.
+        """
+        if self.preview_jobs:
+            return  # Picked up once the running preview is done
+        directory = self.watcher.root
+        changed_codes = set()
+        removed_codes = set()
+        while True:
+            try:
+                changed, removed = self.watch_queue.get_nowait()
+            except queue.Empty:
+                break
+            changed_codes.update(os.path.basename(path)[:-6] for path in changed if os.path.dirname(path) == directory)
+            removed_codes.update(os.path.basename(path)[:-6] for path in removed if os.path.dirname(path) == directory)
+        codes = changed_codes | removed_codes
+        if not codes:
+            return
+        base_path = self.base_combo.currentData()
+        base_code = os.path.basename(base_path)[:-6] if base_path else None
+        try:
+            if removed_codes or changed_codes - self.language_checkboxes.keys():
+                # Files came or went: rebuild both lists, keeping the base and the checked languages
+                base_name = self.base_combo.currentText()
+                unchecked = {code for code, cb in self.language_checkboxes.items() if not cb.isChecked()}
+                self._populate_base_combo(directory)
+                index = self.base_combo.findText(base_name)
+                if index > 0:
+                    self.base_combo.setCurrentIndex(index)
+                self._populate_language_list(directory)
+                for code in unchecked & self.language_checkboxes.keys():
+                    self.language_checkboxes[code].setChecked(False)
+            elif base_code in codes:
+                self._load_base_file(base_path)
+        except (OSError, UnicodeDecodeError):
+            return  # Mid-write or unreadable; the next change event tries again
+        stale = set(self.previews) if base_code in codes else codes & self.previews.keys()
+        if not stale:
+            return
+        if any(editor.document().isModified() for editor in self.preview_editors.values()):
+            for code in stale:
+                self.tabs.setTabText(self.tabs.indexOf(self.preview_pages[code]), f"{code} (changed on disk)")
+        else:
+            self._do_preview()
+
+    def closeEvent(self, event):
+        self._stop_watcher()
+        super().closeEvent(event)
 
     def _populate_language_list(self, directory):
         for cb in self.language_checkboxes.values(): cb.deleteLater()
@@ -119,7 +205,7 @@ class RulesLocalizationTool(QMainWindow):
     def _populate_base_combo(self, directory):
         self.base_combo.blockSignals(True)
         self.base_combo.clear()
-        self.base_tokens.clear(); self.base_map.clear()
+        self.base = None
         if os.path.isdir(directory):
             rules_files = sorted(
                 fname for fname in os.listdir(directory)
@@ -139,204 +225,170 @@ class RulesLocalizationTool(QMainWindow):
 
     def _on_base_combo_changed(self, index):
         if index < 0:
-            self.base_tokens.clear()
-            self.base_map.clear()
+            self.base = None
             return
         path = self.base_combo.itemData(index)
         if not path:
-            self.base_tokens.clear()
-            self.base_map.clear()
+            self.base = None
             return
         self._load_base_file(path)
 
     def _load_base_file(self, path):
-        """Parse base .rules into tokens and base_map"""
-        self.base_tokens.clear(); self.base_map.clear()
-        stack = []; pending = None
-        with open(path, encoding='utf-8') as f:
-            for line in f:
-                raw = line.rstrip('\n')
-                stripped = raw.lstrip()
-                # blank
-                if not stripped:
-                    pending = None; self.base_tokens.append(('blank', raw)); continue
-                # comment
-                if stripped.startswith('//') or stripped.startswith('/*'):
-                    pending = None; self.base_tokens.append(('comment', raw)); continue
-                # inline section with brace
-                if stripped.endswith('{') and stripped != '{':
-                    # strip trailing comments
-                    name = stripped[:-1].split('//',1)[0].split('/*',1)[0].strip()
-                    stack.append(name); pending = None; self.base_tokens.append(('section_start', raw)); continue
-                # bare brace
-                if stripped == '{':
-                    name = pending.split('//',1)[0].split('/*',1)[0].strip() if pending else ''
-                    stack.append(name); pending = None; self.base_tokens.append(('section_start', raw)); continue
-                # section name line (before brace)
-                if '=' not in stripped and stripped not in ('}', '};'):
-                    pending = stripped.split('//',1)[0].split('/*',1)[0].strip()
-                    self.base_tokens.append(('comment', raw)); continue
-                # section end
-                if stripped in ('}', '};'):
-                    pending = None
-                    if stack: stack.pop()
-                    self.base_tokens.append(('section_end', raw)); continue
-                # key/value
-                m = KV_PATTERN.match(raw)
-                if m:
-                    pending = None
-                    key = m.group('key'); val = m.group('value').strip()
-                    indent = raw[:len(raw)-len(stripped)]
-                    fullkey = '.'.join([s for s in stack if s] + [key])
-                    self.base_tokens.append(('kv', indent, key, fullkey))
-                    self.base_map[fullkey] = val
-                else:
-                    pending = None; self.base_tokens.append(('comment', raw))
-
-    def _parse_target(self, path):
-        """Parse target .rules into fullkey->value map"""
-        mapping = {}
-        if not os.path.isfile(path): return mapping
-        stack = []; pending = None
-        with open(path, encoding='utf-8') as f:
-            for line in f:
-                raw = line.rstrip('\n'); stripped = raw.lstrip()
-                if not stripped:
-                    pending = None; continue
-                if stripped.startswith('//') or stripped.startswith('/*'):
-                    pending = None; continue
-                if stripped.endswith('{') and stripped != '{':
-                    name = stripped[:-1].split('//',1)[0].split('/*',1)[0].strip()
-                    stack.append(name); pending = None; continue
-                if stripped == '{':
-                    name = pending.split('//',1)[0].split('/*',1)[0].strip() if pending else ''
-                    stack.append(name); pending = None; continue
-                if stripped in ('}', '};'):
-                    pending = None
-                    if stack: stack.pop()
-                    continue
-                # key/value
-                m = KV_PATTERN.match(raw)
-                if m:
-                    pending = None
-                    key = m.group('key'); val = m.group('value').strip()
-                    fullkey = '.'.join([s for s in stack if s] + [key])
-                    mapping[fullkey] = val
-                else:
-                    # section name line
-                    if '=' not in stripped and not stripped.startswith('//'):
-                        pending = stripped.split('//',1)[0].split('/*',1)[0].strip()
-                    else:
-                        pending = None
-        print(f"[INFO] Parsed {len(mapping)} entries from {os.path.basename(path)}")
-        return mapping
-
-    def _generate_content(self, target_map):
-        lines = []
-        line_map = {}
-        for token in self.base_tokens:
-            ttype = token[0]
-            if ttype in ('blank', 'comment', 'section_start', 'section_end'):
-                lines.append(token[1])
-            else:  # kv
-                _, indent, key, fullkey = token
-                val = target_map.get(fullkey, self.base_map.get(fullkey, '""'))
-                lines.append(f"{indent}{key} = {val}")
-                line_map[fullkey] = len(lines) - 1
-        return "\n".join(lines), line_map
+        """Parse base .rules into a StringsTemplate"""
+        # Replaced, never modified: a running preview may still be reading the old one
+        self.base = StringsTemplate.load(path)
 
     def _do_preview(self):
         directory = self.dir_edit.text().strip()
         if not directory or not os.path.isdir(directory):
             QMessageBox.warning(self, "Error", "Please select a valid strings directory.")
             return
-        if not self.base_map:
+        if self.base is None or not self.base.keys:
             QMessageBox.warning(self, "Error", "Please select and load a base .rules file.")
             return
+        self.preview_pages = {}
         self.tabs.clear(); self.preview_editors.clear()
         self.preview_lists = {}
-        self.preview_line_maps = {}
+        self.previews = {}
+        self.preview_base = self.base
         self.copy_buttons = {}
         self.selected_keys = {}
-        for code, cb in self.language_checkboxes.items():
-            if not cb.isChecked():
+        codes = [code for code, cb in self.language_checkboxes.items() if cb.isChecked()]
+        if not codes:
+            return
+        self.preview_order = codes
+        # Parse and regenerate every language on worker threads; tabs are added as each one finishes
+        executor = ThreadPoolExecutor(max_workers=min(len(codes), PREVIEW_WORKERS))
+        self.preview_jobs = [
+            (code, executor.submit(preview_language, os.path.join(directory, f"{code}.rules"), self.base))
+            for code in codes
+        ]
+        executor.shutdown(wait=False)
+        # The folder can't change under a running preview
+        self._set_preview_running(True)
+        self._preview_timer.start(PREVIEW_POLL_MS)
+
+    def _set_preview_running(self, running):
+        for button in (self.btn_preview, self.btn_apply, self.btn_dir):
+            button.setEnabled(not running)
+
+    def _collect_previews(self):
+        # Take the finished jobs off the list before handling any of them, so
+        # a dialog's nested event loop re-entering here can't see them again
+        finished = []
+        pending = []
+        for code, future in self.preview_jobs:
+            (finished if future.done() else pending).append((code, future))
+        self.preview_jobs = pending
+        if not self.preview_jobs:
+            self._preview_timer.stop()
+        errors = []
+        for code, future in finished:
+            try:
+                preview = future.result()
+            except Exception as e:
+                errors.append(f"{code}.rules: {e}")
                 continue
-            path = os.path.join(directory, f"{code}.rules")
-            target_map = self._parse_target(path)
-            content, line_map = self._generate_content(target_map)
-            missing_keys = []
-            for token in self.base_tokens:
-                if token[0] != "kv":
-                    continue
-                fullkey = token[3]
-                if fullkey not in target_map:
-                    missing_keys.append(fullkey)
-            editor = QPlainTextEdit()
-            editor.setPlainText(content)
-            editor.setReadOnly(False)
-            font = editor.font()
-            font.setFamily("Consolas")
-            editor.setFont(font)
-            splitter = QSplitter(Qt.Horizontal)
-            splitter.setChildrenCollapsible(False)
-            splitter.addWidget(editor)
-            keys_widget = QWidget()
-            keys_widget.setMinimumWidth(220)
-            keys_layout = QVBoxLayout(keys_widget)
-            keys_layout.setContentsMargins(0, 0, 0, 0)
-            header = QLabel(f"New Keys ({len(missing_keys)})")
-            header.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            keys_layout.addWidget(header)
-            keys_list = QListWidget()
-            keys_list.setSelectionMode(QListWidget.SingleSelection)
-            keys_list.setFocusPolicy(Qt.StrongFocus)
-            keys_list.setAlternatingRowColors(True)
-            if missing_keys:
-                for fullkey in missing_keys:
-                    item = QListWidgetItem(fullkey)
-                    item.setData(Qt.UserRole, fullkey)
-                    keys_list.addItem(item)
-                keys_list.setCurrentRow(0)
-            else:
-                placeholder = QListWidgetItem("No new keys")
-                placeholder.setFlags(Qt.NoItemFlags)
-                keys_list.addItem(placeholder)
-            keys_layout.addWidget(keys_list, 1)
-            splitter.addWidget(keys_widget)
-            button_panel = QWidget()
-            button_panel.setMinimumWidth(90)
-            button_layout = QVBoxLayout(button_panel)
-            button_layout.setContentsMargins(0, 0, 0, 0)
-            button_layout.addStretch()
-            copy_button = QPushButton("Copy Value")
-            copy_button.setEnabled(False)
-            copy_button.clicked.connect(lambda _=False, c=code: self._copy_selected_value(c))
-            button_layout.addWidget(copy_button)
-            button_layout.addStretch()
-            splitter.addWidget(button_panel)
-            splitter.setStretchFactor(0, 4)
-            splitter.setStretchFactor(1, 2)
-            splitter.setStretchFactor(2, 0)
-            keys_list.currentItemChanged.connect(lambda current, _prev, c=code: self._on_key_selected(c, current))
-            self.tabs.addTab(splitter, code)
-            self.preview_editors[code] = editor
-            self.preview_lists[code] = keys_list
-            self.preview_line_maps[code] = line_map
-            self.copy_buttons[code] = copy_button
-            self.selected_keys[code] = None
-            if missing_keys:
-                current_item = keys_list.currentItem()
-                if current_item is not None:
-                    self._on_key_selected(code, current_item)
+            self._add_preview_tab(code, preview)
+        if not self.preview_jobs:
+            self._set_preview_running(False)
+        if errors:
+            QMessageBox.critical(self, "Preview failed", "Could not preview:\n" + "\n".join(errors))
+
+    def _add_preview_tab(self, code, preview):
+        """Add an empty tab for a finished preview; its widgets are built the first time it is shown."""
+        page = QWidget()
+        page_layout = QVBoxLayout(page)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        self.previews[code] = preview
+        self.preview_pages[code] = page
+        # Keep tabs in checkbox order however the results arrive
+        order = self.preview_order
+        index = sum(1 for other in self.preview_pages if order.index(other) < order.index(code))
+        self.tabs.insertTab(index, page, code)
+        if self.tabs.currentWidget() is page and code not in self.preview_editors:
+            self._build_preview_tab(code)
+
+    def _on_tab_changed(self, index):
+        page = self.tabs.widget(index)
+        for code, other in self.preview_pages.items():
+            if other is page:
+                if code not in self.preview_editors:
+                    self._build_preview_tab(code)
+                return
+
+    def _build_preview_tab(self, code):
+        preview = self.previews[code]
+        editor = QPlainTextEdit()
+        editor.setPlainText(preview.content)
+        editor.setReadOnly(False)
+        font = editor.font()
+        font.setFamily("Consolas")
+        editor.setFont(font)
+        splitter = QSplitter(Qt.Horizontal)
+        splitter.setChildrenCollapsible(False)
+        splitter.addWidget(editor)
+        keys_widget = QWidget()
+        keys_widget.setMinimumWidth(220)
+        keys_layout = QVBoxLayout(keys_widget)
+        keys_layout.setContentsMargins(0, 0, 0, 0)
+        key_view = QComboBox()
+        for field, label in KEY_VIEWS:
+            key_view.addItem(f"{label} ({len(getattr(preview, field))})", field)
+        keys_layout.addWidget(key_view)
+        # A view over a string model only creates rows as they scroll into sight
+        keys_list = QListView()
+        keys_list.setModel(QStringListModel(keys_list))
+        keys_list.setSelectionMode(QListView.SingleSelection)
+        keys_list.setEditTriggers(QListView.NoEditTriggers)
+        keys_list.setUniformItemSizes(True)
+        keys_list.setFocusPolicy(Qt.StrongFocus)
+        keys_list.setAlternatingRowColors(True)
+        keys_layout.addWidget(keys_list, 1)
+        empty_label = QLabel()
+        empty_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        keys_layout.addWidget(empty_label, 1)
+        splitter.addWidget(keys_widget)
+        button_panel = QWidget()
+        button_panel.setMinimumWidth(90)
+        button_layout = QVBoxLayout(button_panel)
+        button_layout.setContentsMargins(0, 0, 0, 0)
+        button_layout.addStretch()
+        copy_button = QPushButton("Copy Value")
+        copy_button.setEnabled(False)
+        copy_button.clicked.connect(lambda _=False, c=code: self._copy_selected_value(c))
+        button_layout.addWidget(copy_button)
+        button_layout.addStretch()
+        splitter.addWidget(button_panel)
+        splitter.setStretchFactor(0, 4)
+        splitter.setStretchFactor(1, 2)
+        splitter.setStretchFactor(2, 0)
+        keys_list.selectionModel().currentChanged.connect(
+            lambda current, _prev, c=code: self._on_key_selected(c, current.data() if current.isValid() else None)
+        )
+        key_view.currentIndexChanged.connect(lambda _index, c=code, v=key_view: self._show_keys(c, v.currentData()))
+        self.preview_pages[code].layout().addWidget(splitter)
+        self.preview_editors[code] = editor
+        self.preview_lists[code] = (keys_list, empty_label)
+        self.copy_buttons[code] = copy_button
+        self.selected_keys[code] = None
+        self._show_keys(code, KEY_VIEWS[0][0])
 
-    def _on_key_selected(self, code, item):
+    def _show_keys(self, code, field):
+        """Show one of a tab's key sets in its key list."""
+        keys_list, empty_label = self.preview_lists[code]
+        keys = getattr(self.previews[code], field)
+        keys_list.model().setStringList(keys)
+        keys_list.setVisible(bool(keys))
+        empty_label.setVisible(not keys)
+        if keys:
+            keys_list.setCurrentIndex(keys_list.model().index(0))
+        else:
+            empty_label.setText(f"No {dict(KEY_VIEWS)[field].lower()}")
+            self._on_key_selected(code, None)
+
+    def _on_key_selected(self, code, key):
         button = self.copy_buttons.get(code)
-        if item is None:
-            self.selected_keys[code] = None
-            if button:
-                button.setEnabled(False)
-            return
-        key = item.data(Qt.UserRole) if item is not None else None
         if not key:
             self.selected_keys[code] = None
             if button:
@@ -349,10 +401,10 @@ class RulesLocalizationTool(QMainWindow):
 
     def _highlight_key(self, code, fullkey):
         editor = self.preview_editors.get(code)
-        line_map = self.preview_line_maps.get(code, {})
-        if not editor or fullkey not in line_map:
+        # Removed keys aren't in the regenerated file
+        if not editor or self.preview_base is None or fullkey not in self.preview_base.key_lines:
             return
-        block = editor.document().findBlockByNumber(line_map[fullkey])
+        block = editor.document().findBlockByNumber(self.preview_base.key_lines[fullkey])
         if not block.isValid():
             return
         line_text = block.text()
@@ -403,13 +455,19 @@ class RulesLocalizationTool(QMainWindow):
         if not key:
             return
         editor = self.preview_editors.get(code)
-        line_map = self.preview_line_maps.get(code, {})
-        if not editor or key not in line_map:
-            return
-        block = editor.document().findBlockByNumber(line_map[key])
-        if not block.isValid():
+        if not editor or self.preview_base is None:
             return
-        text = block.text()
+        if key in self.preview_base.key_lines:
+            block = editor.document().findBlockByNumber(self.preview_base.key_lines[key])
+            if not block.isValid():
+                return
+            text = block.text()
+        else:
+            # A removed key: copy what the language file had
+            removed_value = self.previews[code].removed_values.get(key)
+            if removed_value is None:
+                return
+            text = f"{key} = {removed_value}"
         value_text, _start, _end = self._get_value_info(text)
         if value_text is None:
             eq_index = text.find('=')
@@ -426,15 +484,24 @@ class RulesLocalizationTool(QMainWindow):
         if not directory or not os.path.isdir(directory):
             QMessageBox.warning(self, "Error", "Please select a valid strings directory.")
             return
-        for code, editor in self.preview_editors.items():
-            if not self.language_checkboxes.get(code, True).isChecked(): continue
-            text = editor.toPlainText(); out = os.path.join(directory, f"{code}.rules")
-            if os.path.isfile(out): shutil.copy(out, out + '.backup')
-            try:
-                with open(out, 'w', encoding='utf-8') as f: f.write(text)
-            except Exception as e:
-                QMessageBox.critical(self, "Write failed", f"Could not write {out}: {e}")
-        QMessageBox.information(self, "Done", "Selected files updated (backups created).")
+        files = {}
+        for code, preview in self.previews.items():
+            # A language previewed before its checkbox went away (e.g. a watcher refresh) is still written
+            checkbox = self.language_checkboxes.get(code)
+            if checkbox is not None and not checkbox.isChecked(): continue
+            # Tabs never opened can't have been edited
+            editor = self.preview_editors.get(code)
+            files[os.path.join(directory, f"{code}.rules")] = editor.toPlainText() if editor else preview.content
+        results = write_language_files(files)
+        failed = [f"{os.path.basename(path)}: {error}" for path, status, error in results if error]
+        if failed:
+            QMessageBox.critical(self, "Write failed", "Could not write:\n" + "\n".join(failed))
+        lines = [f"{os.path.basename(path)}: {status}" for path, status, error in results if not error]
+        if lines:
+            message = "\n".join(lines)
+            if any(status == 'updated' for _path, status, _error in results):
+                message += "\n\nUpdated files were backed up to .rules.backup."
+            QMessageBox.information(self, "Done", message)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
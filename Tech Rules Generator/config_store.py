@@ -0,0 +1,67 @@
+import io
+import os
+
+# Changes made within this window are written to disk together, in milliseconds
+SAVE_DELAY_MS = 1000
+
+
+class ConfigWriter:
+    """Write-behind saver for a ConfigParser owned by a Tk app.
+
+    schedule() only marks the config dirty; the first call opens a short window
+    and every change made during it is written in one go when the Tk loop gets
+    to it. flush() writes immediately (call it on exit). Writes go through a
+    temp file and os.replace, and are skipped when the rendered text matches
+    what is already on disk.
+    """
+
+    def __init__(self, widget, config, path, delay_ms=SAVE_DELAY_MS):
+        self.widget = widget
+        self.config = config
+        self.path = path
+        self.delay_ms = delay_ms
+        self._job = None
+        self._written = None
+
+    def load(self):
+        """Read the config file if it exists. Returns True if it was found."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r') as file:
+            text = file.read()
+        self.config.read_string(text)
+        self._written = text
+        return True
+
+    def schedule(self):
+        if self._job is None:
+            self._job = self.widget.after(self.delay_ms, self.flush)
+
+    def render(self):
+        buffer = io.StringIO()
+        self.config.write(buffer)
+        return buffer.getvalue()
+
+    def flush(self):
+        """Write pending changes now. Returns True if the file was written."""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass  # Already fired or the window is gone
+            self._job = None
+
+        text = self.render()
+        if text == self._written:
+            return False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as file:
+                file.write(text)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._written = text
+        return True
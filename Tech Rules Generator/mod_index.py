@@ -0,0 +1,178 @@
+import os
+import json
+import sqlite3
+
+from mod_scanner import iter_rules_files, parse_rules_file, scan_files
+
+# Changed files are written to the database in batches while the scan is running
+COMMIT_BATCH = 200
+
+# Index database lives next to config.ini so it persists between sessions
+INDEX_FILE = "mod_index.db"
+# Bump when parsing or the schema changes; an index from another version is rebuilt
+INDEX_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT NOT NULL,
+    root TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    is_part INTEGER NOT NULL,
+    part_ids TEXT NOT NULL,
+    name_key TEXT,
+    icon_name_key TEXT,
+    description_key TEXT,
+    editor_groups TEXT NOT NULL,
+    editor_groups_plural INTEGER NOT NULL,
+    -- Per root, so nested or overlapping mod roots keep separate rows for shared files
+    PRIMARY KEY (root, path)
+);
+"""
+
+
+class ModIndex:
+    """Persistent index of the .rules files in a mod, refreshed incrementally by mtime/size."""
+
+    def __init__(self, mod_root, db_path=INDEX_FILE):
+        self.mod_root = os.path.abspath(mod_root)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.conn.executescript(f"DROP TABLE IF EXISTS files; PRAGMA user_version = {INDEX_VERSION};")
+        self.conn.executescript(SCHEMA)
+        # Paths dropped by the last completed refresh
+        self.removed = []
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stored_stats(self):
+        rows = self.conn.execute(
+            "SELECT path, mtime_ns, size FROM files WHERE root = ?", (self.mod_root,)
+        )
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def _row(self, path, mtime_ns, size, record):
+        return (
+            path, self.mod_root, mtime_ns, size, int(record['is_part']),
+            json.dumps(record['part_ids']), record['name_key'], record['icon_name_key'],
+            record['description_key'], json.dumps(record['editor_groups']),
+            int(record['editor_groups_plural']),
+        )
+
+    def _store(self, rows):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def iter_refresh(self, workers=None, use_processes=False, progress=None, cancel=None):
+        """Re-parse only files that were added or changed since the last refresh.
+
+        Changed files are read and parsed in parallel and yielded as (path, record)
+        as soon as each one is done. progress(done, total) is called as files finish.
+        Stopping early keeps everything indexed so far; removed files, and changed
+        files that could no longer be read, are only dropped once the scan runs
+        to completion. Setting cancel (a threading.Event) stops the directory walk
+        or the parsing early in the same way.
+        """
+        stored = self._stored_stats()
+        stats = {}
+        for path, mtime_ns, size in iter_rules_files(self.mod_root, cancel):
+            if stored.pop(path, None) != (mtime_ns, size):
+                stats[path] = (mtime_ns, size)
+        if cancel is not None and cancel.is_set():
+            return
+
+        rows = []
+        unread = set(stats)  # Changed files scan_files hasn't returned (yet)
+        total = len(stats)
+        if progress is not None:
+            progress(0, total)
+        files = scan_files(list(stats), workers=workers, use_processes=use_processes)
+        try:
+            for done, (path, record) in enumerate(files, 1):
+                if cancel is not None and cancel.is_set():
+                    return
+                rows.append(self._row(path, *stats[path], record))
+                unread.discard(path)
+                if progress is not None:
+                    progress(done, total)
+                if len(rows) >= COMMIT_BATCH:
+                    with self.conn:
+                        self._store(rows)
+                    rows = []
+                yield path, record
+        finally:
+            files.close()
+            with self.conn:
+                self._store(rows)
+
+        # Whatever is left in stored no longer exists on disk. Changed files that
+        # couldn't be read lose their stale row, so the next refresh tries them again.
+        dropped = list(stored) + sorted(unread)
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE root = ? AND path = ?", [(self.mod_root, p) for p in dropped])
+        self.removed = dropped
+
+    def refresh(self, workers=None, use_processes=False):
+        """Bring the index up to date. Returns (changed_paths, removed_paths).
+
+        removed_paths includes changed files that could not be read.
+        """
+        changed = [path for path, _record in self.iter_refresh(workers, use_processes)]
+        return changed, self.removed
+
+    def update_file(self, path):
+        """Re-index a single file, or drop it if it no longer exists."""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.remove_file(path)
+            return False
+        record = parse_rules_file(path)
+        if record is None:
+            return False
+        with self.conn:
+            self._store([self._row(path, stat.st_mtime_ns, stat.st_size, record)])
+        return True
+
+    def remove_file(self, path):
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE root = ? AND path = ?", (self.mod_root, os.path.abspath(path)))
+
+    def part_ids(self):
+        """Sorted, de-duplicated list of every Part ID in the mod."""
+        ids = set()
+        rows = self.conn.execute(
+            "SELECT part_ids FROM files WHERE root = ? AND is_part = 1", (self.mod_root,)
+        )
+        for (part_ids,) in rows:
+            ids.update(json.loads(part_ids))
+        return sorted(ids)
+
+    def parts(self):
+        """Return one dict per indexed Part file, ordered by path."""
+        rows = self.conn.execute(
+            "SELECT path, part_ids, name_key, icon_name_key, description_key, editor_groups, editor_groups_plural "
+            "FROM files WHERE root = ? AND is_part = 1 ORDER BY path", (self.mod_root,)
+        )
+        return [
+            {
+                'path': path,
+                'part_ids': json.loads(part_ids),
+                'name_key': name_key,
+                'icon_name_key': icon_name_key,
+                'description_key': description_key,
+                'editor_groups': json.loads(editor_groups),
+                'editor_groups_plural': bool(plural),
+            }
+            for path, part_ids, name_key, icon_name_key, description_key, editor_groups, plural in rows
+        ]
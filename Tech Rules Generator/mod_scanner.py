@@ -0,0 +1,147 @@
+import os
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+PART_PATTERN = re.compile(r'^\s*Part\s*:', re.MULTILINE)
+ID_PATTERN = re.compile(r'^\s*ID\s*=\s*\"?([^\n\"]+)\"?', re.MULTILINE)
+KEY_PATTERNS = {
+    field: re.compile(rf"^\s*{field}\s*=\s*\"?([^\n\"]+)\"?", re.MULTILINE)
+    for field in ('NameKey', 'IconNameKey', 'DescriptionKey')
+}
+EDITORGROUPS_PATTERN = re.compile(r"EditorGroups\s*=\s*\[([^\]]+)\]", re.IGNORECASE)
+EDITORGROUP_PATTERN = re.compile(r"EditorGroup\s*=\s*\"?([^\n\"]+)\"?", re.IGNORECASE)
+
+# Reads are I/O bound (and often on slow or network drives), so use more threads than cores
+DEFAULT_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _strip_comment(value):
+    return value.split('//')[0].strip()
+
+
+def parse_rules_content(content):
+    """Extract Part IDs, string keys and EditorGroups from .rules content."""
+    is_part = bool(PART_PATTERN.search(content))
+    record = {
+        'is_part': is_part,
+        'part_ids': [],
+        'name_key': None,
+        'icon_name_key': None,
+        'description_key': None,
+        'editor_groups': [],
+        'editor_groups_plural': False,
+    }
+    if not is_part:
+        return record
+
+    # Only the Part's own ID, the first one in the file; later IDs belong to components and toggles
+    match = ID_PATTERN.search(content)
+    record['part_ids'] = [_strip_comment(match.group(1))] if match else []
+    for field, column in (('NameKey', 'name_key'), ('IconNameKey', 'icon_name_key'), ('DescriptionKey', 'description_key')):
+        match = KEY_PATTERNS[field].search(content)
+        if match:
+            record[column] = _strip_comment(match.group(1))
+
+    match_plural = EDITORGROUPS_PATTERN.search(content)
+    if match_plural:
+        groups = match_plural.group(1).split(',')
+        record['editor_groups'] = [grp.strip().strip('"').split('//')[0].strip() for grp in groups]
+        record['editor_groups_plural'] = True
+    else:
+        match_singular = EDITORGROUP_PATTERN.search(content)
+        if match_singular:
+            record['editor_groups'] = [_strip_comment(match_singular.group(1))]
+    return record
+
+
+def parse_rules_file(file_path):
+    """Read and parse a single .rules file. Returns None if it can't be read."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError:
+        return None
+    return parse_rules_content(content)
+
+
+def iter_rules_files(mod_root, cancel=None):
+    """Yield (path, mtime_ns, size) for every .rules file below mod_root.
+
+    cancel is an optional threading.Event; the walk stops at the next directory once it is set.
+    """
+    stack = [mod_root]
+    while stack:
+        if cancel is not None and cancel.is_set():
+            return
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.rules') and entry.is_file():
+                            stat = entry.stat()
+                            yield entry.path, stat.st_mtime_ns, stat.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _read_file(file_path):
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def scan_files(paths, workers=None, use_processes=False):
+    """Read and parse .rules files in parallel, yielding (path, record) as each one finishes.
+
+    Files are read on a thread pool. With use_processes=True the regex parsing is
+    handed to a process pool as well, which helps when parsing outweighs the reads.
+    Files that can't be read are skipped. Closing the generator early cancels
+    whatever hasn't started yet.
+    """
+    io_pool = ThreadPoolExecutor(max_workers=workers or DEFAULT_IO_WORKERS)
+    cpu_pool = ProcessPoolExecutor() if use_processes else None
+    try:
+        if cpu_pool is None:
+            futures = {io_pool.submit(parse_rules_file, path): path for path in paths}
+            for future in as_completed(futures):
+                record = future.result()
+                if record is not None:
+                    yield futures[future], record
+            return
+
+        # Both stages report to one queue, so parse results are yielded while reads are still running
+        finished = queue.SimpleQueue()
+        reads = {}
+        for path in paths:
+            future = io_pool.submit(_read_file, path)
+            reads[future] = path
+            future.add_done_callback(finished.put)
+        parses = {}
+        while reads or parses:
+            future = finished.get()
+            if future in reads:
+                path = reads.pop(future)
+                try:
+                    content = future.result()
+                except OSError:
+                    continue
+                parse = cpu_pool.submit(parse_rules_content, content)
+                parses[parse] = path
+                parse.add_done_callback(finished.put)
+            else:
+                yield parses.pop(future), future.result()
+    finally:
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        if cpu_pool is not None:
+            cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scan_mod(mod_root, workers=None, use_processes=False):
+    """Scan every .rules file under mod_root, yielding (path, record) as results arrive."""
+    paths = [path for path, _mtime_ns, _size in iter_rules_files(mod_root)]
+    yield from scan_files(paths, workers=workers, use_processes=use_processes)
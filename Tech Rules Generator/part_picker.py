@@ -0,0 +1,262 @@
+import bisect
+import tkinter as tk
+from tkinter import font as tkfont
+from collections import defaultdict
+
+# Delay between the last keystroke and re-filtering, in milliseconds
+FILTER_DELAY_MS = 150
+# Batches up to this size are inserted one by one; bigger ones are merged with a single sort
+INSORT_LIMIT = 32
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IdSearchIndex:
+    """Sorted Part ID list with prefix and substring lookup.
+
+    Prefix queries use a binary search over the lower-cased IDs. Longer substring
+    queries intersect a trigram index first, so only a handful of candidates have
+    to be checked instead of every ID in the mod.
+    """
+
+    def __init__(self, ids=()):
+        self.ids = []
+        self._id_set = set()
+        self._lowered = []  # (lowercase id, id), sorted for prefix bisects
+        self._trigrams = defaultdict(set)
+        self.add(ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, part_id):
+        return part_id in self._id_set
+
+    def add(self, ids):
+        """Add IDs, ignoring ones already indexed. Returns the IDs that were new."""
+        added = [part_id for part_id in dict.fromkeys(ids) if part_id not in self._id_set]
+        if not added:
+            return added
+        self._id_set.update(added)
+        if len(added) <= INSORT_LIMIT:
+            # A few IDs at a time (file by file during a scan): insert in place, no re-sort
+            for part_id in added:
+                bisect.insort(self.ids, part_id)
+                bisect.insort(self._lowered, (part_id.lower(), part_id))
+        else:
+            # Sorting the existing (already sorted) list plus the new run is close to linear
+            self.ids.extend(added)
+            self.ids.sort()
+            self._lowered.extend((part_id.lower(), part_id) for part_id in added)
+            self._lowered.sort()
+        for part_id in added:
+            for trigram in _trigrams(part_id.lower()):
+                self._trigrams[trigram].add(part_id)
+        return added
+
+    def remove(self, ids):
+        """Drop IDs from the index, ignoring ones it doesn't have. Returns the IDs that were removed."""
+        removed = [part_id for part_id in dict.fromkeys(ids) if part_id in self._id_set]
+        for part_id in removed:
+            self._id_set.discard(part_id)
+            del self.ids[bisect.bisect_left(self.ids, part_id)]
+            lowered = part_id.lower()
+            del self._lowered[bisect.bisect_left(self._lowered, (lowered, part_id))]
+            for trigram in _trigrams(lowered):
+                bucket = self._trigrams.get(trigram)
+                if bucket is not None:
+                    bucket.discard(part_id)
+                    if not bucket:
+                        del self._trigrams[trigram]
+        return removed
+
+    def set(self, ids):
+        self.ids = []
+        self._id_set = set()
+        self._lowered = []
+        self._trigrams = defaultdict(set)
+        self.add(ids)
+
+    def search(self, text):
+        """Return matching IDs in sorted order: prefix matches for the text, then substring matches."""
+        text = text.strip().lower()
+        if not text:
+            return self.ids
+        start = bisect.bisect_left(self._lowered, (text,))
+        end = bisect.bisect_left(self._lowered, (text + '\uffff',))
+        prefix = [part_id for _lowered, part_id in self._lowered[start:end]]
+
+        if len(text) >= 3:
+            trigrams = sorted(_trigrams(text), key=lambda t: len(self._trigrams.get(t, ())))
+            candidates = set(self._trigrams.get(trigrams[0], ()))
+            for trigram in trigrams[1:]:
+                candidates &= self._trigrams.get(trigram, set())
+                if not candidates:
+                    break
+            candidates = sorted(candidates)
+        else:
+            candidates = self.ids
+        prefix_set = set(prefix)
+        return prefix + [
+            part_id for part_id in candidates
+            if part_id not in prefix_set and text in part_id.lower()
+        ]
+
+
+class PartIdPicker(tk.Frame):
+    """Multi-select Part ID list with type-ahead filtering.
+
+    Only the rows currently on screen are drawn, so the widget stays responsive
+    with tens of thousands of IDs. Selection is tracked as a set of IDs, not
+    listbox indices, so it survives filtering and IDs arriving during a scan.
+    """
+
+    def __init__(self, master, ids=(), selected=(), height=20, **kwargs):
+        super().__init__(master, **kwargs)
+        self.index = IdSearchIndex(ids)
+        self.selected = set(selected)
+        self.shown = self.index.ids
+        self.top = 0
+        self._filter_job = None
+        self._rows = []
+
+        filter_frame = tk.Frame(self)
+        filter_frame.pack(fill=tk.X)
+        tk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *_: self._schedule_filter())
+        self.filter_entry = tk.Entry(filter_frame, textvariable=self.filter_var)
+        self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+
+        list_frame = tk.Frame(self)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        self.scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(list_frame, background='white', highlightthickness=1, takefocus=1)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.font = tkfont.nametofont('TkDefaultFont')
+        self.row_height = self.font.metrics('linespace') + 4
+        self.canvas.configure(height=self.row_height * height)
+
+        self.status_label = tk.Label(self, anchor='w', font=("Helvetica", 9, "italic"))
+        self.status_label.pack(fill=tk.X)
+
+        self.canvas.bind('<Configure>', lambda e: self.render())
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda e: self._scroll_rows(-3))
+        self.canvas.bind('<Button-5>', lambda e: self._scroll_rows(3))
+        self.filter_entry.bind('<Return>', lambda e: self._apply_filter())
+        self.filter_entry.focus_set()
+
+    # --- data ---
+
+    def add_ids(self, ids):
+        """Add IDs found after the picker was opened."""
+        if self.index.add(ids):
+            self._apply_filter(keep_position=True)
+
+    def remove_ids(self, ids):
+        """Drop IDs that no longer exist in the mod. They stay selected if they were."""
+        if self.index.remove(ids):
+            self._apply_filter(keep_position=True)
+
+    def set_ids(self, ids):
+        self.index.set(ids)
+        self._apply_filter(keep_position=True)
+
+    def selected_ids(self):
+        return sorted(self.selected)
+
+    def clear_selection(self):
+        self.selected.clear()
+        self.render()
+
+    def select_shown(self):
+        self.selected.update(self.shown)
+        self.render()
+
+    # --- filtering ---
+
+    def _schedule_filter(self):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self, keep_position=False):
+        self._filter_job = None
+        self.shown = self.index.search(self.filter_var.get())
+        if not keep_position:
+            self.top = 0
+        self.render()
+
+    # --- rendering ---
+
+    def _visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def _clamp_top(self):
+        self.top = max(0, min(self.top, len(self.shown) - self._visible_rows()))
+
+    def render(self):
+        """Draw just the rows in view, reusing canvas items between redraws."""
+        self._clamp_top()
+        visible = self._visible_rows()
+        width = self.canvas.winfo_width()
+        while len(self._rows) < visible + 1:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, outline='')
+            text = self.canvas.create_text(4, 0, anchor='nw', font=self.font)
+            self._rows.append((rect, text))
+
+        for row, (rect, text) in enumerate(self._rows):
+            index = self.top + row
+            y = row * self.row_height
+            if row <= visible and index < len(self.shown):
+                part_id = self.shown[index]
+                is_selected = part_id in self.selected
+                self.canvas.coords(rect, 0, y, width, y + self.row_height)
+                self.canvas.itemconfigure(rect, fill='#0078d7' if is_selected else 'white', state='normal')
+                self.canvas.coords(text, 4, y + 2)
+                self.canvas.itemconfigure(text, text=part_id, fill='white' if is_selected else 'black', state='normal')
+            else:
+                self.canvas.itemconfigure(rect, state='hidden')
+                self.canvas.itemconfigure(text, state='hidden')
+
+        total = len(self.shown)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.status_label.config(text=f"{total} of {len(self.index)} IDs shown, {len(self.selected)} selected")
+
+    # --- events ---
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        index = self.top + int(event.y // self.row_height)
+        if index < len(self.shown):
+            part_id = self.shown[index]
+            if part_id in self.selected:
+                self.selected.discard(part_id)
+            else:
+                self.selected.add(part_id)
+            self.render()
+
+    def _scroll_rows(self, rows):
+        self.top += rows
+        self.render()
+
+    def _on_mousewheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.shown))
+        elif unit == 'pages':
+            self.top += int(amount) * self._visible_rows()
+        else:
+            self.top += int(amount)
+        self.render()
@@ -0,0 +1,345 @@
+"""Check that &<file>/Path references in a mod's .rules files point at something.
+
+Each referenced file is parsed once into a tree of dicts and lists and kept
+for the whole run, and every (file, path) lookup is memoized, so checking
+thousands of references mostly costs dictionary lookups.
+
+Run directly to check a mod from the command line:
+    python rules_references.py path/to/mod [file.rules ...]
+"""
+import os
+import re
+import sys
+from collections import namedtuple
+
+from mod_scanner import iter_rules_files
+from techrules_core import mask_rules_content
+
+# &<file.rules>/Path/To/Field; the file part may contain spaces
+REFERENCE_PATTERN = re.compile(r'&<([^<>\n]+)>((?:/[^\s/,;\[\]{}()"]+)*)')
+TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\\n])*"|&?<[^<>\n]*>[^\s,;\[\]{}=:]*|[{}\[\]=:,;]|[^\s{}\[\]=:,;"]+')
+# Game files are referenced through ./Data/ and can't be checked from the mod folder
+GAME_DATA_PREFIXES = ('./data/', 'data/')
+MAX_INHERIT_DEPTH = 16
+
+OK = 'ok'
+DANGLING = 'dangling'
+MISSING_FILE = 'missing file'
+PARSE_ERROR = 'parse error'
+EXTERNAL = 'external'  # Points into the game's own Data folder
+UNVERIFIABLE = 'unverifiable'  # Could be inherited from something outside the mod
+
+Reference = namedtuple('Reference', 'file line target path text')
+Resolution = namedtuple('Resolution', 'status detail')
+Problem = namedtuple('Problem', 'reference status detail')
+
+
+class RulesObject(dict):
+    """A { ... } block. Keys are lower-cased; inherits holds the raw ': Base' references."""
+    __slots__ = ('inherits',)
+
+    def __init__(self):
+        super().__init__()
+        self.inherits = []
+
+
+class RulesParseError(ValueError):
+    pass
+
+
+def _tokenize(content):
+    """Yield (token, line) for comment-free content."""
+    masked, _ = mask_rules_content(content)
+    line = 1
+    last = 0
+    for match in TOKEN_PATTERN.finditer(masked):
+        line += masked.count('\n', last, match.start())
+        last = match.start()
+        yield match.group(0), line
+
+
+class _Parser:
+    def __init__(self, content):
+        self.tokens = list(_tokenize(content))
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        root = self.parse_object(closing=None)
+        if self.pos < len(self.tokens):
+            token, line = self.peek()
+            raise RulesParseError(f"unexpected '{token}' on line {line}")
+        return root
+
+    def parse_inherits(self, node):
+        # Name : Base, OtherBase { ... }
+        line = self.peek()[1]
+        while True:
+            token, token_line = self.peek()
+            if token is None or token in '{[=' or token_line != line:
+                return
+            self.take()
+            if token != ',':
+                node.inherits.append(token)
+
+    def parse_scalar(self):
+        # A scalar runs to the end of its line or the next separator, so "5 * 2" stays one value
+        token, line = self.take()
+        parts = [token]
+        while True:
+            next_token, next_line = self.peek()
+            if next_token is None or next_line != line or next_token in '{}[],;=':
+                return ' '.join(parts).strip('"')
+            parts.append(self.take()[0])
+
+    def parse_value(self):
+        token, line = self.peek()
+        if token is None:
+            raise RulesParseError("unexpected end of file")
+        if token == '{':
+            self.take()
+            return self.parse_object(closing='}')
+        if token == '[':
+            self.take()
+            return self.parse_array()
+        if token == ':':
+            node = RulesObject()
+            self.take()
+            self.parse_inherits(node)
+            if self.peek()[0] == '{':
+                self.take()
+                body = self.parse_object(closing='}')
+                body.inherits = node.inherits
+                return body
+            return node
+        if token in '}]=,;':
+            raise RulesParseError(f"unexpected '{token}' on line {line}")
+        return self.parse_scalar()
+
+    def parse_array(self):
+        items = []
+        while True:
+            token, line = self.peek()
+            if token is None:
+                raise RulesParseError("missing ']'")
+            if token == ']':
+                self.take()
+                return items
+            if token in ',;':
+                self.take()
+                continue
+            items.append(self.parse_value())
+
+    def parse_object(self, closing):
+        node = RulesObject()
+        while True:
+            token, line = self.peek()
+            if token is None:
+                if closing:
+                    raise RulesParseError(f"missing '{closing}'")
+                return node
+            if token == closing:
+                self.take()
+                return node
+            if token in ',;':
+                self.take()
+                continue
+            if token in '{}[]=:':
+                raise RulesParseError(f"unexpected '{token}' on line {line}")
+
+            name = self.take()[0].strip('"').lower()
+            inherits = RulesObject()
+            if self.peek()[0] == ':':
+                self.take()
+                self.parse_inherits(inherits)
+            next_token = self.peek()[0]
+            if next_token == '=':
+                self.take()
+                value = self.parse_value()
+            elif next_token in ('{', '['):
+                value = self.parse_value()
+            elif inherits.inherits:
+                value = RulesObject()  # Name : Base with no body of its own
+            else:
+                value = ''  # Bare name, e.g. a flag
+            if isinstance(value, RulesObject) and inherits.inherits:
+                value.inherits = inherits.inherits + value.inherits
+            node[name] = value
+
+
+def parse_rules(content):
+    """Parse .rules content into nested RulesObject/list/str values. Raises RulesParseError."""
+    return _Parser(content).parse()
+
+
+def find_references(path, content):
+    """Yield every &<file>/Path reference outside comments in a file's content."""
+    masked, _ = mask_rules_content(content)
+    line = 1
+    last = 0
+    for match in REFERENCE_PATTERN.finditer(masked):
+        line += masked.count('\n', last, match.start())
+        last = match.start()
+        yield Reference(
+            path,
+            line,
+            match.group(1).strip(),
+            tuple(part for part in match.group(2).split('/') if part),
+            match.group(0),
+        )
+
+
+def is_game_path(target):
+    return target.replace('\\', '/').lower().startswith(GAME_DATA_PREFIXES)
+
+
+class ReferenceResolver:
+    """Resolve references against parsed files, caching every tree and lookup."""
+
+    def __init__(self):
+        self.trees = {}  # abspath -> (mtime_ns, size, tree or RulesParseError)
+        self.resolved = {}  # (abspath, path) -> Resolution
+
+    def load(self, path):
+        """Return the parsed tree for path, re-parsing only if the file changed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self.trees.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            tree = cached[2]
+        else:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                    tree = parse_rules(file.read())
+            except RulesParseError as e:
+                tree = e
+            self.trees[path] = (stat.st_mtime_ns, stat.st_size, tree)
+            # Lookups may have gone through the old tree, directly or via inheritance
+            self.resolved.clear()
+        if isinstance(tree, RulesParseError):
+            raise tree
+        return tree
+
+    def resolve(self, reference):
+        """Resolve a Reference made from find_references."""
+        if is_game_path(reference.target):
+            return Resolution(EXTERNAL, "game data")
+        base_dir = os.path.dirname(os.path.abspath(reference.file))
+        return self.resolve_path(os.path.join(base_dir, reference.target), reference.path)
+
+    def resolve_path(self, file_path, path, depth=0):
+        file_path = os.path.abspath(file_path)
+        if not os.path.isfile(file_path):
+            return Resolution(MISSING_FILE, file_path)
+        try:
+            tree = self.load(file_path)
+        except RulesParseError as e:
+            return Resolution(PARSE_ERROR, f"{file_path}: {e}")
+        key = (file_path, path)
+        if key not in self.resolved:
+            self.resolved[key] = self._walk(file_path, tree, path, depth)
+        return self.resolved[key]
+
+    def _walk(self, file_path, node, path, depth):
+        for i, segment in enumerate(path):
+            if segment in ('..', '^', '~'):
+                return Resolution(UNVERIFIABLE, "relative path")
+            if isinstance(node, list):
+                if not segment.isdigit() or int(segment) >= len(node):
+                    return Resolution(DANGLING, f"no index {segment} in /{'/'.join(path[:i])} ({len(node)} items)")
+                node = node[int(segment)]
+            elif isinstance(node, RulesObject):
+                if segment.lower() in node:
+                    node = node[segment.lower()]
+                elif node.inherits:
+                    return self._resolve_inherited(file_path, node.inherits, path[i:], path[:i], depth)
+                else:
+                    return Resolution(DANGLING, f"no '{segment}' in /{'/'.join(path[:i])}")
+            else:
+                return Resolution(DANGLING, f"/{'/'.join(path[:i])} is a value, not a block")
+        return Resolution(OK, "")
+
+    def _resolve_inherited(self, file_path, inherits, rest, walked, depth):
+        """Look up the rest of a path in a block's base blocks."""
+        if depth >= MAX_INHERIT_DEPTH:
+            return Resolution(UNVERIFIABLE, "inheritance too deep")
+        status = DANGLING
+        for base in inherits:
+            base = base.lstrip('&')
+            match = re.match(r'<([^<>]+)>(.*)', base)
+            if match:
+                if is_game_path(match.group(1)):
+                    return Resolution(UNVERIFIABLE, f"/{'/'.join(walked)} inherits from game data")
+                base_file = os.path.join(os.path.dirname(file_path), match.group(1))
+                base_path = match.group(2)
+            elif base.startswith('/'):
+                base_file, base_path = file_path, base
+            else:
+                return Resolution(UNVERIFIABLE, f"/{'/'.join(walked)} inherits from {base}")
+            result = self.resolve_path(base_file, tuple(p for p in base_path.split('/') if p) + rest, depth + 1)
+            if result.status == OK:
+                return result
+            if result.status != DANGLING:
+                status = result.status
+        if status == DANGLING:
+            return Resolution(DANGLING, f"no '{rest[0]}' in /{'/'.join(walked)} or its base blocks")
+        return Resolution(status, f"/{'/'.join(walked)} inherits from a block that can't be checked")
+
+    def check_files(self, paths):
+        """Check every reference in the given files. Returns (problems, counts by status)."""
+        problems = []
+        counts = {}
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                    content = file.read()
+            except OSError:
+                continue
+            for reference in find_references(path, content):
+                result = self.resolve(reference)
+                counts[result.status] = counts.get(result.status, 0) + 1
+                if result.status in (DANGLING, MISSING_FILE, PARSE_ERROR):
+                    problems.append(Problem(reference, result.status, result.detail))
+        return problems, counts
+
+    def check_mod(self, mod_root):
+        return self.check_files(path for path, _mtime, _size in iter_rules_files(mod_root))
+
+
+def format_problems(problems, counts, root=None):
+    """Human-readable text for check_files results."""
+    total = sum(counts.values())
+    lines = [f"{total} references checked: {counts.get(OK, 0)} resolved, {len(problems)} broken."]
+    skipped = counts.get(EXTERNAL, 0) + counts.get(UNVERIFIABLE, 0)
+    if skipped:
+        lines.append(f"{skipped} point into game data or inherited blocks and were not checked.")
+    for problem in problems:
+        reference = problem.reference
+        file_name = os.path.relpath(reference.file, root) if root else reference.file
+        lines.append("")
+        lines.append(f"{file_name}:{reference.line}: {reference.text}")
+        lines.append(f"  {problem.status}: {problem.detail}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python rules_references.py MOD_ROOT [FILE.rules ...]", file=sys.stderr)
+        return 2
+    root, files = argv[0], argv[1:]
+    resolver = ReferenceResolver()
+    problems, counts = resolver.check_files(files) if files else resolver.check_mod(root)
+    print(format_problems(problems, counts, root))
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+from collections import defaultdict, deque
+
+from techrules_core import parse_techs
+
+
+class TechGraph:
+    """Prerequisite graph over the Techs entries of a techs.rules file.
+
+    Edges point from a tech to the techs it requires. Techs can be added one at
+    a time; add_tech only walks the ancestors of the new entry to look for a
+    cycle, so checking each new entry stays cheap on large career trees. Whole
+    files are loaded without those checks; validate() finds every cycle in one
+    pass. Prerequisites that aren't defined in the graph are treated as external
+    (e.g. vanilla techs) unless strict is set.
+    """
+
+    def __init__(self, strict=False):
+        self.strict = strict
+        self.prerequisites = {}  # tech id -> list of prerequisite ids, in insertion order
+        self.dependents = defaultdict(set)  # prerequisite id -> tech ids that require it
+        self.duplicates = set()
+
+    @classmethod
+    def from_content(cls, content, strict=False):
+        """Build the graph of a whole file directly, with no per-entry cycle check."""
+        graph = cls(strict=strict)
+        for entry in parse_techs(content).entries:
+            if entry.id:
+                graph._set_tech(entry.id, entry.prerequisites)
+        return graph
+
+    def __contains__(self, tech_id):
+        return tech_id in self.prerequisites
+
+    def __len__(self):
+        return len(self.prerequisites)
+
+    def find_path(self, start_ids, target):
+        """Follow prerequisite edges from start_ids and return the path to target, or None."""
+        parents = {}
+        queue = deque()
+        for tech_id in start_ids:
+            if tech_id not in parents:
+                parents[tech_id] = None
+                queue.append(tech_id)
+        while queue:
+            tech_id = queue.popleft()
+            if tech_id == target:
+                path = []
+                while tech_id is not None:
+                    path.append(tech_id)
+                    tech_id = parents[tech_id]
+                return path[::-1]
+            for prereq in self.prerequisites.get(tech_id, ()):
+                if prereq not in parents:
+                    parents[prereq] = tech_id
+                    queue.append(prereq)
+        return None
+
+    def would_create_cycle(self, tech_id, prerequisites):
+        """Return the cycle (as a list of IDs) that adding this entry would close, or None."""
+        path = self.find_path(prerequisites, tech_id)
+        return [tech_id] + path if path else None
+
+    def _set_tech(self, tech_id, prerequisites):
+        """Add or replace a tech without checking for cycles."""
+        if tech_id in self.prerequisites:
+            self.duplicates.add(tech_id)
+            self.remove_tech(tech_id)
+        prerequisites = list(dict.fromkeys(prerequisites))
+        self.prerequisites[tech_id] = prerequisites
+        for prereq in prerequisites:
+            self.dependents[prereq].add(tech_id)
+
+    def add_tech(self, tech_id, prerequisites):
+        """Add or replace a tech. Returns the cycle it closes, if any; the tech is added either way."""
+        if tech_id in self.prerequisites:
+            self.duplicates.add(tech_id)
+            self.remove_tech(tech_id)
+        cycle = self.would_create_cycle(tech_id, list(dict.fromkeys(prerequisites)))
+        self._set_tech(tech_id, prerequisites)
+        return cycle
+
+    def remove_tech(self, tech_id):
+        for prereq in self.prerequisites.pop(tech_id, ()):
+            self.dependents[prereq].discard(tech_id)
+
+    def missing_prerequisites(self):
+        """Map of tech id -> prerequisites that aren't defined in the graph."""
+        missing = {}
+        for tech_id, prerequisites in self.prerequisites.items():
+            unknown = [p for p in prerequisites if p not in self.prerequisites]
+            if unknown:
+                missing[tech_id] = unknown
+        return missing
+
+    def topological_order(self):
+        """Kahn's algorithm in O(V+E): prerequisites come before the techs that need them.
+
+        Returns (order, blocked) where blocked holds every tech that can never be
+        unlocked because it sits on, or depends on, a cycle (or, when strict, on
+        a missing prerequisite).
+        """
+        remaining = {}
+        ready = deque()
+        for tech_id, prerequisites in self.prerequisites.items():
+            known = [p for p in prerequisites if p in self.prerequisites]
+            if self.strict and len(known) != len(prerequisites):
+                remaining[tech_id] = -1  # Never becomes ready
+                continue
+            remaining[tech_id] = len(known)
+            if not known:
+                ready.append(tech_id)
+
+        order = []
+        while ready:
+            tech_id = ready.popleft()
+            order.append(tech_id)
+            for dependent in self.dependents.get(tech_id, ()):
+                if remaining.get(dependent, -1) > 0:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+
+        unlocked = set(order)
+        blocked = [tech_id for tech_id in self.prerequisites if tech_id not in unlocked]
+        return order, blocked
+
+    def find_cycles(self):
+        """Return every cycle as a list of IDs, using Tarjan's strongly connected components (O(V+E))."""
+        index_of = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        cycles = []
+        counter = 0
+
+        for root in self.prerequisites:
+            if root in index_of:
+                continue
+            # Iterative DFS so deep career trees don't hit the recursion limit
+            work = [(root, iter(self.prerequisites[root]))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in self.prerequisites:
+                        continue
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.prerequisites[child])))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.prerequisites[node]:
+                        cycles.append(component[::-1])
+        return cycles
+
+    def validate(self):
+        """Run every check and return a dict report."""
+        order, blocked = self.topological_order()
+        return {
+            'techs': len(self.prerequisites),
+            'cycles': self.find_cycles(),
+            'missing': self.missing_prerequisites(),
+            'blocked': blocked,
+            'duplicates': sorted(self.duplicates),
+            'order': order,
+        }
+
+
+def format_report(report):
+    """Human-readable text for a TechGraph.validate() report."""
+    lines = [f"{report['techs']} techs checked."]
+    if report['duplicates']:
+        lines.append("")
+        lines.append("Duplicate tech IDs (the last entry wins):")
+        lines.extend(f"  {tech_id}" for tech_id in report['duplicates'])
+    if report['cycles']:
+        lines.append("")
+        lines.append("Prerequisite cycles (A -> B means A requires B):")
+        lines.extend("  " + " -> ".join(cycle + cycle[:1]) for cycle in report['cycles'])
+    if report['blocked']:
+        lines.append("")
+        lines.append("Techs that can never be unlocked:")
+        lines.extend(f"  {tech_id}" for tech_id in report['blocked'])
+    if report['missing']:
+        lines.append("")
+        lines.append("Prerequisites not defined in this file (fine if they are vanilla or other mods' techs):")
+        lines.extend(f"  {tech_id}: {', '.join(missing)}" for tech_id, missing in sorted(report['missing'].items()))
+    if not (report['duplicates'] or report['cycles'] or report['blocked']):
+        lines.append("")
+        lines.append("No cycles or unreachable techs found.")
+    lines.append("")
+    lines.append("Unlock order:")
+    lines.extend(f"  {tech_id}" for tech_id in report['order'])
+    return "\n".join(lines)
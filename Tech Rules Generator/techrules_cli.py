@@ -0,0 +1,169 @@
+"""Generate techs.rules entries without the GUI.
+
+Examples:
+    python techrules_cli.py --techrules modes/career/techs.rules ships/laser/laser.rules --cost 500
+    python techrules_cli.py --techrules modes/career/techs.rules --manifest parts.json --write
+
+A manifest is a JSON list of parts, or an object with "parts" and optional
+"defaults" applied to every part:
+
+    {
+        "defaults": {"cost": 500},
+        "parts": [
+            {"part": "ships/laser/laser.rules", "prerequisites": ["author.hull"]},
+            {"part": "ships/armor/armor.rules", "editorgroups": [0], "cost": 250}
+        ]
+    }
+
+Relative part paths in a manifest are resolved against the manifest's folder.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from mod_scanner import DEFAULT_IO_WORKERS
+from techrules_core import build_tech_entry
+from techs_updater import TechsFile
+
+MANIFEST_FIELDS = ('part', 'cost', 'prerequisites', 'parts_unlocked', 'editorgroups')
+
+
+def _split_ids(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def _as_list(value):
+    return _split_ids(value) if isinstance(value, str) else list(value or [])
+
+
+def load_manifest(path):
+    """Read a manifest file into a list of part specs (dicts with MANIFEST_FIELDS keys)."""
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    defaults = {}
+    if isinstance(data, dict):
+        defaults = data.get('defaults', {})
+        data = data.get('parts', [])
+    if not isinstance(data, list):
+        raise ValueError("Manifest must be a list of parts or an object with a 'parts' list.")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    specs = []
+    for number, item in enumerate(data, 1):
+        if isinstance(item, str):
+            item = {'part': item}
+        spec = dict(defaults, **item)
+        unknown = set(spec) - set(MANIFEST_FIELDS)
+        if unknown:
+            raise ValueError(f"Manifest part {number} has unknown fields: {', '.join(sorted(unknown))}")
+        if not spec.get('part'):
+            raise ValueError(f"Manifest part {number} has no 'part' path.")
+        spec['part'] = os.path.join(base_dir, spec['part'])
+        specs.append(spec)
+    return specs
+
+
+def build_entry(spec, techrules_path):
+    """Build one entry from a part spec. Returns (part_path, part_id, entry_text, error)."""
+    part_path = spec['part']
+    cost = spec.get('cost')
+    if cost is None or cost == '':
+        return part_path, None, None, "no cost given"
+    editorgroups = spec.get('editorgroups')
+    try:
+        part_id, entry = build_tech_entry(
+            part_path,
+            techrules_path,
+            cost,
+            prerequisites=_as_list(spec.get('prerequisites')),
+            parts_unlocked=_as_list(spec.get('parts_unlocked')) or None,
+            editorgroups=None if editorgroups is None else [int(idx) for idx in _as_list(editorgroups)],
+        )
+    except (OSError, ValueError) as e:
+        return part_path, None, None, str(e)
+    return part_path, part_id, entry, None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate Cosmoteer techs.rules entries from Part files.")
+    parser.add_argument('parts', nargs='*', help="Part .rules files to generate entries for")
+    parser.add_argument('--techrules', required=True, help="techs.rules file the entries are for (paths are made relative to it)")
+    parser.add_argument('--manifest', help="JSON manifest of parts with per-part options")
+    parser.add_argument('--cost', help="Cost of each tech (manifest entries can override it)")
+    parser.add_argument('--prerequisites', help="Comma-separated prerequisite tech IDs")
+    parser.add_argument('--parts-unlocked', help="Comma-separated Part IDs to unlock (default: the Part itself)")
+    parser.add_argument('--editorgroups', help="Comma-separated EditorGroup indices to use (default: all)")
+    parser.add_argument('--write', action='store_true', help="Add or update the entries in --techrules instead of printing them")
+    parser.add_argument('-o', '--output', help="Write the entries to this file instead of stdout")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_IO_WORKERS, help="Part files to read in parallel")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.write and args.output:
+        parser.error("--write and --output can't be used together")
+
+    defaults = {
+        'cost': args.cost,
+        'prerequisites': args.prerequisites,
+        'parts_unlocked': args.parts_unlocked,
+        'editorgroups': args.editorgroups,
+    }
+    specs = [dict(defaults, part=part) for part in args.parts]
+    if args.manifest:
+        try:
+            for spec in load_manifest(args.manifest):
+                # Command line options fill in whatever the manifest leaves out
+                specs.append({key: spec.get(key, defaults.get(key)) for key in MANIFEST_FIELDS})
+        except (OSError, ValueError) as e:
+            print(f"Error: failed to read manifest: {e}", file=sys.stderr)
+            return 2
+    if not specs:
+        parser.error("give at least one Part file or --manifest")
+
+    techrules_path = os.path.abspath(args.techrules)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        # map keeps the manifest order, so output is stable between runs
+        results = list(executor.map(lambda spec: build_entry(spec, techrules_path), specs))
+
+    failed = 0
+    entries = []
+    for part_path, part_id, entry, error in results:
+        if error:
+            failed += 1
+            print(f"Error: {part_path}: {error}", file=sys.stderr)
+        else:
+            entries.append((part_id, entry))
+
+    if args.write:
+        try:
+            techs_file = TechsFile(techrules_path)
+            counts = {'added': 0, 'updated': 0}
+            for part_id, entry in entries:
+                counts[techs_file.upsert(entry, part_id)] += 1
+            techs_file.save()
+        except (OSError, ValueError) as e:
+            print(f"Error: failed to update {techrules_path}: {e}", file=sys.stderr)
+            return 2
+        print(f"{counts['added']} added, {counts['updated']} updated in {techrules_path}", file=sys.stderr)
+    else:
+        text = "\n\n".join(entry for _part_id, entry in entries) + "\n"
+        if args.output:
+            try:
+                with open(args.output, 'w', encoding='utf-8') as file:
+                    file.write(text)
+            except OSError as e:
+                print(f"Error: failed to write {args.output}: {e}", file=sys.stderr)
+                return 2
+        else:
+            sys.stdout.write(text)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
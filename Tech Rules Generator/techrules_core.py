@@ -0,0 +1,289 @@
+import os
+import re
+from collections import namedtuple
+
+DEFAULT_BATCH_COST = 500
+
+# Strings and comments in .rules content; comments are masked before looking for structure
+CODE_PATTERN = re.compile(r'"(?:\\.|[^"\\\n])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+TECHS_PATTERN = re.compile(r'\bTechs\s*(?:=\s*)?\[')
+TECH_ID_PATTERN = re.compile(r'^\s*ID\s*=\s*"?([^\s",\]}]+)"?', re.MULTILINE | re.IGNORECASE)
+TECH_LIST_PATTERNS = {
+    field: re.compile(rf'\b{field}\s*=\s*\[([^\]]*)\]', re.IGNORECASE)
+    for field in ('Prerequisites', 'PartsUnlocked')
+}
+
+# One { ... } entry of the Techs array; start/end are offsets into the file content
+TechEntry = namedtuple('TechEntry', 'id prerequisites parts_unlocked start end')
+# All entries plus the offsets of the Techs array's [ and ]
+TechsLayout = namedtuple('TechsLayout', 'entries array_start array_end')
+
+# Snippet users paste into mod.rules to load a generated techs.rules file
+MOD_RULES_SNIPPET = """//Instructions: Uncomment and add the following snippet to your mod.rules file to activate this file:
+
+// +++++++++ vv insert below in mod.rules vv ++++++++++ //
+// Adding Techs to Career Mode
+/*{
+    Action = AddMany
+    AddTo = "<./Data/modes/career/techs.rules>/Techs"
+    ManyToAdd = &<modes/career/techs.rules>/Techs
+}*/
+// +++++++++ ^^ insert above in mod.rules ^^ ++++++++++ //
+"""
+
+
+def extract_field(content, field_name):
+    """Extract the value of a given field from Part file content, or None."""
+    pattern = rf"^\s*{field_name}\s*=\s*\"?([^\n\"]+)\"?"
+    matches = re.findall(pattern, content, re.MULTILINE)
+    if matches:
+        # Return the first match, stripping any comments or trailing content
+        return matches[0].split('//')[0].strip()
+    return None
+
+
+def extract_editorgroups(content):
+    """Extract EditorGroup or EditorGroups from Part file content.
+
+    Returns (groups, is_plural); groups is empty if the Part has neither.
+    """
+    # Try to find EditorGroups array
+    match_plural = re.search(r"EditorGroups\s*=\s*\[([^\]]+)\]", content, re.IGNORECASE)
+    if match_plural:
+        groups = match_plural.group(1).split(',')
+        groups = [grp.strip().strip('"').split('//')[0].strip() for grp in groups]
+        return groups, True
+
+    # Try to find single EditorGroup
+    match_singular = re.search(r"EditorGroup\s*=\s*\"?([^\n\"]+)\"?", content, re.IGNORECASE)
+    if match_singular:
+        return [match_singular.group(1).split('//')[0].strip()], False
+
+    return [], False
+
+
+def build_tech_entry(part_path, techrules_path, cost, prerequisites=(), parts_unlocked=None, editorgroups=None):
+    """Read a Part file and format its tech entry without any GUI state.
+
+    parts_unlocked defaults to the Part itself and editorgroups (indices into the
+    Part's EditorGroups) defaults to all of them. Returns (part_id, entry_text);
+    raises OSError if the Part can't be read and ValueError if it is unusable.
+    """
+    with open(part_path, 'r', encoding='utf-8', errors='replace') as file:
+        content = file.read()
+
+    part_id = extract_field(content, 'ID')
+    if not part_id:
+        raise ValueError(f"Failed to extract 'ID' from Part file: {part_path}")
+    groups, is_plural = extract_editorgroups(content)
+    if not groups:
+        raise ValueError(f"Failed to extract 'EditorGroup' or 'EditorGroups' from Part file: {part_path}")
+
+    relative_path = relative_rules_path(part_path, techrules_path)
+    if editorgroups is None:
+        editorgroups = range(len(groups))
+    for idx in editorgroups:
+        if not 0 <= idx < len(groups):
+            raise ValueError(f"EditorGroup index {idx} is out of range for {part_path} ({len(groups)} groups).")
+    editorgroup_line = editorgroup_field(relative_path, editorgroups, len(groups), is_plural)
+    entry = format_tech_entry(part_id, relative_path, editorgroup_line, parts_unlocked or [part_id], list(prerequisites), cost)
+    return part_id, entry
+
+
+def relative_rules_path(part_path, techrules_path):
+    """Path of the Part file relative to the techs.rules directory, with forward slashes."""
+    techrules_dir = os.path.dirname(os.path.abspath(techrules_path))
+    return os.path.relpath(os.path.abspath(part_path), techrules_dir).replace("\\", "/")
+
+
+def editorgroup_field(relative_path, selected_indices, total_editorgroups, is_plural):
+    """Build the EditorGroup(s) line for the selected EditorGroups of a Part.
+
+    Raises ValueError if nothing is selected, or several groups are selected on
+    a Part that only has a singular EditorGroup.
+    """
+    selected_indices = list(selected_indices)
+    if not selected_indices:
+        raise ValueError("Please select at least one Editor Group.")
+
+    if is_plural:
+        if len(selected_indices) == total_editorgroups:
+            # All editor groups selected
+            return f"EditorGroups = &<{relative_path}>/Part/EditorGroups"
+        if len(selected_indices) == 1:
+            # Single Editor Group selected
+            return f"EditorGroup = &<{relative_path}>/Part/EditorGroups/{selected_indices[0]}"
+        # Multiple but not all editor groups selected
+        editorgroup_paths = [f"&<{relative_path}>/Part/EditorGroups/{idx}" for idx in selected_indices]
+        return f"EditorGroups = [{', '.join(editorgroup_paths)}]"
+
+    # Part file has singular EditorGroup
+    if len(selected_indices) == 1:
+        return f"EditorGroup = &<{relative_path}>/Part/EditorGroup"
+    raise ValueError("Cannot select multiple Editor Groups when Part file has single 'EditorGroup'.")
+
+
+def format_tech_entry(part_id, relative_path, editorgroup_line, parts_unlocked, prerequisites, cost, indent=""):
+    """Format one Techs entry. editorgroup_line may be None to leave EditorGroup out."""
+    lines = [
+        "{",
+        f"    ID = {part_id}",
+        f"    NameKey = &<{relative_path}>/Part/NameKey",
+        f"    DescriptionKey = &<{relative_path}>/Part/DescriptionKey",
+        f"    Icon = &<{relative_path}>/Part/EditorIcon",
+    ]
+    if editorgroup_line:
+        lines.append(f"    {editorgroup_line}")
+    lines.append(f"    PartsUnlocked = [{', '.join(parts_unlocked)}]")
+    if prerequisites:
+        lines.append(f"    Prerequisites = [{', '.join(prerequisites)}]")
+    lines.append(f"    Cost = {cost}")
+    lines.append("}")
+    return "\n".join(indent + line for line in lines)
+
+
+def batch_category(part):
+    """Category comment a Part is grouped under: its first EditorGroup."""
+    return part['editor_groups'][0] if part['editor_groups'] else "Uncategorized"
+
+
+def batch_techs(parts):
+    """Group Parts into {category: [(part_id, part), ...]}, one tech per Part file.
+
+    The tech uses the Part's own ID, the first ID in the file (as build_tech_entry
+    does). A Part whose ID was already taken by an earlier one is skipped, so no
+    two techs share an ID.
+    """
+    categories = {}
+    seen = set()
+    for part in parts:
+        if not part['part_ids']:
+            continue
+        part_id = part['part_ids'][0]
+        if part_id not in seen:
+            seen.add(part_id)
+            categories.setdefault(batch_category(part), []).append((part_id, part))
+    return categories
+
+
+def iter_batch_techs(parts, techrules_path, cost=DEFAULT_BATCH_COST, categories=None):
+    """Yield the text of a complete techs.rules file with one tech per Part, chunk by chunk.
+
+    parts are ModIndex.parts() records; categories may be passed in if batch_techs
+    was already run on them. Each tech unlocks its Part and uses all of the
+    Part's EditorGroups. Entries are grouped under a category comment per EditorGroup.
+    """
+    if categories is None:
+        categories = batch_techs(parts)
+
+    yield "//AutoGenerated by TechRulesGenerator\n\n"
+    yield MOD_RULES_SNIPPET
+    yield "\nTechs\n[\n"
+    for category in sorted(categories, key=str.lower):
+        yield f"//{category} Category\n\n"
+        for part_id, part in sorted(categories[category], key=lambda item: item[0]):
+            relative_path = relative_rules_path(part['path'], techrules_path)
+            groups = part['editor_groups']
+            line = None
+            if groups:
+                line = editorgroup_field(relative_path, range(len(groups)), len(groups), part['editor_groups_plural'])
+            yield format_tech_entry(part_id, relative_path, line, [part_id], [], cost, indent="    ") + "\n\n"
+    yield "]\n"
+
+
+def write_batch_techs(parts, techrules_path, cost=DEFAULT_BATCH_COST):
+    """Stream a batch techs.rules to disk through a temp file, then swap it into place.
+
+    Returns the number of tech entries written.
+    """
+    categories = batch_techs(parts)
+    tmp_path = techrules_path + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for chunk in iter_batch_techs(parts, techrules_path, cost, categories):
+                file.write(chunk)
+        os.replace(tmp_path, techrules_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sum(len(items) for items in categories.values())
+
+
+def mask_rules_content(content):
+    """Return (comments_masked, all_masked) copies of content with the same offsets.
+
+    comments_masked has comments blanked out; all_masked also blanks string
+    contents so braces and brackets inside strings don't count as structure.
+    Newlines are kept so line-based patterns still work.
+    """
+    comments = []
+    structure = []
+    last = 0
+    for match in CODE_PATTERN.finditer(content):
+        comments.append(content[last:match.start()])
+        structure.append(content[last:match.start()])
+        token = match.group(0)
+        blank = re.sub(r'[^\n]', ' ', token)
+        if token.startswith('"'):
+            comments.append(token)
+            structure.append('"' + blank[1:-1] + '"')
+        else:
+            comments.append(blank)
+            structure.append(blank)
+        last = match.end()
+    comments.append(content[last:])
+    structure.append(content[last:])
+    return ''.join(comments), ''.join(structure)
+
+
+def _split_list(text):
+    return [item.strip().strip('"') for item in text.split(',') if item.strip()]
+
+
+def parse_tech_entry(text, start=0, end=None):
+    """Pull ID, Prerequisites and PartsUnlocked out of one comment-free entry."""
+    id_match = TECH_ID_PATTERN.search(text)
+    lists = {}
+    for field, pattern in TECH_LIST_PATTERNS.items():
+        match = pattern.search(text)
+        lists[field] = _split_list(match.group(1)) if match else []
+    return TechEntry(
+        id_match.group(1) if id_match else None,
+        lists['Prerequisites'],
+        lists['PartsUnlocked'],
+        start,
+        start + len(text) if end is None else end,
+    )
+
+
+def parse_techs(content):
+    """Find every { ... } entry in the Techs array of a techs.rules file.
+
+    Commented-out entries are ignored. Returns a TechsLayout; if the file has no
+    Techs array, entries is empty and the array offsets are None.
+    """
+    comments_masked, masked = mask_rules_content(content)
+    array_match = TECHS_PATTERN.search(masked)
+    if not array_match:
+        return TechsLayout([], None, None)
+
+    entries = []
+    depth = 0
+    entry_start = None
+    array_start = array_match.end() - 1
+    for match in re.finditer(r'[\[\]{}]', masked[array_match.end():]):
+        pos = array_match.end() + match.start()
+        char = match.group(0)
+        if char in '[{':
+            if depth == 0 and char == '{':
+                entry_start = pos
+            depth += 1
+        else:
+            if depth == 0:
+                return TechsLayout(entries, array_start, pos)
+            depth -= 1
+            if depth == 0 and char == '}' and entry_start is not None:
+                entries.append(parse_tech_entry(comments_masked[entry_start:pos + 1], entry_start))
+                entry_start = None
+    return TechsLayout(entries, array_start, None)
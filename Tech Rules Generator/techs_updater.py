@@ -0,0 +1,116 @@
+import os
+
+from techrules_core import parse_techs, parse_tech_entry
+
+ENTRY_INDENT = "    "
+# Bytes that aren't valid UTF-8 are kept as surrogates and written back unchanged
+ENCODING_ERRORS = 'surrogateescape'
+
+
+class TechsFile:
+    """A techs.rules file parsed once and kept in memory with an ID -> span index.
+
+    upsert() splices a single entry into the cached content and shifts the spans
+    that follow it, so repeated edits never re-parse the file. The file is only
+    re-read when something else changed it on disk. Saves go through a temp file
+    and os.replace so a crash can't leave a half-written techs.rules behind.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.content = ""
+        self.spans = {}  # tech id -> [start, end) offsets into content
+        self.array_end = None
+        self.newline = "\n"
+        self._stat_key = None
+        self.load()
+
+    def _current_stat_key(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8', errors=ENCODING_ERRORS, newline='') as file:
+            self.content = file.read()
+        self._stat_key = self._current_stat_key()
+        # Keep the file's own line endings when splicing entries in
+        self.newline = "\r\n" if "\r\n" in self.content else "\n"
+        layout = parse_techs(self.content)
+        self.array_end = layout.array_end
+        self.spans = {entry.id: [entry.start, entry.end] for entry in layout.entries if entry.id}
+
+    def reload_if_changed(self):
+        """Re-read the file only if it changed on disk since it was last loaded or saved."""
+        if self._current_stat_key() != self._stat_key:
+            self.load()
+            return True
+        return False
+
+    def display_text(self):
+        """The content for showing in a widget, with undecodable bytes as U+FFFD."""
+        return self.content.encode('utf-8', ENCODING_ERRORS).decode('utf-8', 'replace')
+
+    def get(self, tech_id):
+        span = self.spans.get(tech_id)
+        return self.content[span[0]:span[1]] if span else None
+
+    def _shift(self, after, delta):
+        for span in self.spans.values():
+            if span[0] >= after:
+                span[0] += delta
+                span[1] += delta
+        if self.array_end is not None and self.array_end >= after:
+            self.array_end += delta
+
+    def _line_indent(self, offset):
+        line_start = self.content.rfind('\n', 0, offset) + 1
+        prefix = self.content[line_start:offset]
+        return prefix if not prefix.strip() else ENTRY_INDENT
+
+    def upsert(self, entry_text, tech_id=None):
+        """Replace the entry with the same ID, or append it to the end of the Techs array.
+
+        entry_text is a single { ... } entry (as made by format_tech_entry). Returns
+        'updated' or 'added'. Call save() to write the change to disk.
+        """
+        entry_text = entry_text.strip().replace("\r\n", "\n")
+        if tech_id is None:
+            tech_id = parse_tech_entry(entry_text).id
+        if not tech_id:
+            raise ValueError("Tech entry has no ID.")
+
+        span = self.spans.get(tech_id)
+        if span:
+            start, end = span
+            indent = self._line_indent(start)
+            new_text = entry_text.replace("\n", self.newline + indent)
+            self.content = self.content[:start] + new_text + self.content[end:]
+            delta = len(new_text) - (end - start)
+            span[1] = start + len(new_text)
+            self._shift(end, delta)
+            return 'updated'
+
+        if self.array_end is None:
+            raise ValueError("No Techs [ ... ] array found in techs.rules.")
+        insert_at = self.array_end
+        before = "" if self.content.endswith("\n", 0, insert_at) else self.newline
+        body = entry_text.replace("\n", self.newline + ENTRY_INDENT)
+        new_text = before + ENTRY_INDENT + body + self.newline
+        self.content = self.content[:insert_at] + new_text + self.content[insert_at:]
+        start = insert_at + len(before) + len(ENTRY_INDENT)
+        self._shift(insert_at, len(new_text))
+        self.spans[tech_id] = [start, start + len(body)]
+        return 'added'
+
+    def save(self):
+        """Atomically write the cached content back to disk."""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', errors=ENCODING_ERRORS, newline='') as file:
+                file.write(self.content)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._stat_key = self._current_stat_key()
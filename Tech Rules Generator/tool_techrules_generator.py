@@ -1,9 +1,24 @@
 import tkinter as tk
-from tkinter import messagebox, filedialog
+from tkinter import messagebox, filedialog, simpledialog
 import pyperclip
 import os
 import configparser
-import re
+import queue
+import bisect
+import sqlite3
+import threading
+
+from config_store import ConfigWriter
+from mod_index import ModIndex
+from rules_watcher import RulesWatcher
+from rules_references import ReferenceResolver, format_problems
+from part_picker import PartIdPicker
+from tech_graph import TechGraph, format_report
+from techs_updater import TechsFile
+from techrules_core import (
+    DEFAULT_BATCH_COST, MOD_RULES_SNIPPET, editorgroup_field, extract_editorgroups,
+    extract_field, format_tech_entry, relative_rules_path, write_batch_techs
+)
 
 class TechRulesGenerator(tk.Tk):
     def __init__(self):
@@ -14,6 +29,7 @@ class TechRulesGenerator(tk.Tk):
         # Initialize configuration
         self.config_file = "config.ini"
         self.config = configparser.ConfigParser()
+        self.config_writer = ConfigWriter(self, self.config, self.config_file)
 
         # Placeholder for dynamic fields
         self.dynamic_fields = {}
@@ -21,9 +37,34 @@ class TechRulesGenerator(tk.Tk):
         # Initialize prerequisite IDs list
         self.prerequisite_ids = []
 
+        # Background prerequisite scan state
+        self.scan_thread = None
+        self.scan_cancel = None
+        self.scan_queue = queue.Queue()
+        # (mod_root, file_path, cost) of a batch techs.rules waiting for the scan to finish
+        self.pending_batch = None
+        # Open ID pickers that mirror prerequisite_ids
+        self.id_pickers = []
+
+        # Prerequisite graph of the current techs.rules, cached with the file's mtime
+        self.tech_graph = None
+        self.tech_graph_key = None
+
+        # Parsed techs.rules kept in memory for in-place updates
+        self.techs_file = None
+
+        # Parsed files reused between reference checks until they change on disk
+        self.reference_resolver = ReferenceResolver()
+
         # Initialize editor groups plural flag
         self.is_editorgroups_plural = False
 
+        # Watches the mod for .rules changes and keeps the mod index up to date
+        self.watcher = None
+        self._watch_after = None  # after() id of the pending poll_watcher
+        self.watch_queue = queue.Queue()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Load configuration
         self.load_config()
 
@@ -55,15 +96,16 @@ class TechRulesGenerator(tk.Tk):
         self.load_saved_paths()
 
     def load_config(self):
-        if os.path.exists(self.config_file):
-            self.config.read(self.config_file)
-        else:
+        if self.config_writer.load():
+            # Older versions stored every Part ID here; the mod index already caches them
+            if self.config.remove_section('Prerequisites'):
+                self.save_config()
+        if not self.config.has_section('Paths'):
             self.config['Paths'] = {}
-            self.config['Prerequisites'] = {}
 
     def save_config(self):
-        with open(self.config_file, 'w') as configfile:
-            self.config.write(configfile)
+        """Queue a config write; changes made close together are saved as one write."""
+        self.config_writer.schedule()
 
     def setup_scrollable_main_frame(self):
         # Create a canvas and a vertical scrollbar for scrolling
@@ -108,6 +150,13 @@ class TechRulesGenerator(tk.Tk):
         self.mod_root_help_label = tk.Label(self.step1_frame, text="Example: Select the mod.rules file located at your mod's root directory.", font=("Helvetica", 9, "italic"))
         self.mod_root_help_label.pack(anchor='w', padx=10)
 
+        # Prerequisite scan progress and cancel button (shown while a scan is running)
+        self.scan_frame = tk.Frame(self.step1_frame)
+        self.scan_frame.pack(anchor='w', padx=10, pady=(5, 0))
+        self.scan_status_label = tk.Label(self.scan_frame, text="", font=("Helvetica", 9))
+        self.scan_status_label.pack(side='left')
+        self.scan_cancel_button = tk.Button(self.scan_frame, text="Cancel Scan", command=self.cancel_prerequisite_scan)
+
     def setup_step2(self):
         # Step 2 Frame
         self.step2_frame = tk.Frame(self.scrollable_frame)
@@ -120,6 +169,10 @@ class TechRulesGenerator(tk.Tk):
         self.generate_techrules_button = tk.Button(self.step2_frame, text="Generate techs.rules File", command=self.generate_techs_rules, state='disabled')
         self.generate_techrules_button.pack(pady=10, anchor='w')
 
+        # Batch generate techs.rules for every Part in the mod
+        self.generate_all_techs_button = tk.Button(self.step2_frame, text="Generate Techs for All Parts", command=self.generate_all_techs, state='disabled')
+        self.generate_all_techs_button.pack(pady=(0, 10), anchor='w')
+
         # techs.rules File Selection
         self.techrules_label = tk.Label(self.step2_frame, text="Select the techs.rules file:")
         self.techrules_label.pack(anchor='w', pady=(5, 0))
@@ -161,6 +214,12 @@ class TechRulesGenerator(tk.Tk):
         self.show_techrules_button = tk.Button(self.scrollable_frame, text="Show techs.rules Readout", command=self.show_techrules, state='disabled')
         self.show_techrules_button.pack(pady=10)
 
+        self.validate_techs_button = tk.Button(self.scrollable_frame, text="Validate Tech Tree", command=self.validate_tech_tree)
+        self.validate_techs_button.pack(pady=(0, 10))
+
+        self.check_references_button = tk.Button(self.scrollable_frame, text="Check References", command=self.check_references)
+        self.check_references_button.pack(pady=(0, 10))
+
     def setup_step4(self):
         # Step 4 Frame
         self.step4_frame = tk.Frame(self.scrollable_frame)
@@ -198,6 +257,7 @@ class TechRulesGenerator(tk.Tk):
                 self.mod_root_entry.insert(0, os.path.join(mod_root, 'mod.rules'))
                 # Enable dependent buttons
                 self.generate_techrules_button.config(state='normal')
+                self.generate_all_techs_button.config(state='normal')
                 self.techrules_browse_button.config(state='normal')
                 self.part_browse_button.config(state='normal')
                 # Load prerequisite IDs
@@ -233,6 +293,7 @@ class TechRulesGenerator(tk.Tk):
             self.save_config()
             # Enable dependent buttons
             self.generate_techrules_button.config(state='normal')
+            self.generate_all_techs_button.config(state='normal')
             self.techrules_browse_button.config(state='normal')
             self.part_browse_button.config(state='normal')
             # Load prerequisite IDs immediately
@@ -283,7 +344,7 @@ class TechRulesGenerator(tk.Tk):
             return
 
         # Parse Part ID
-        part_id = self.extract_field(content, 'ID')
+        part_id = extract_field(content, 'ID')
         if part_id:
             self.part_id_entry.config(state='normal')
             self.part_id_entry.delete(0, tk.END)
@@ -296,7 +357,7 @@ class TechRulesGenerator(tk.Tk):
             return
 
         # Parse EditorGroups
-        editorgroups, is_plural = self.extract_editorgroups(content)
+        editorgroups, is_plural = extract_editorgroups(content)
         self.is_editorgroups_plural = is_plural  # Store whether plural or singular
         if editorgroups:
             self.editorgroups_listbox.delete(0, tk.END)
@@ -313,35 +374,6 @@ class TechRulesGenerator(tk.Tk):
         # Enable generate button
         self.show_techrules_button.config(state='normal')
 
-    def extract_field(self, content, field_name):
-        """Extract the value of a given field from the content."""
-        pattern = rf"^\s*{field_name}\s*=\s*\"?([^\n\"]+)\"?"
-        matches = re.findall(pattern, content, re.MULTILINE)
-        if matches:
-            # Return the first match, stripping any comments or trailing content
-            value = matches[0].split('//')[0].strip()
-            return value
-        return None
-
-    def extract_editorgroups(self, content):
-        """Extract EditorGroup or EditorGroups from the Part file content."""
-        # Try to find EditorGroups array
-        pattern_plural = r"EditorGroups\s*=\s*\[([^\]]+)\]"
-        match_plural = re.search(pattern_plural, content, re.IGNORECASE)
-        if match_plural:
-            groups = match_plural.group(1).split(',')
-            groups = [grp.strip().strip('"').split('//')[0].strip() for grp in groups]
-            return groups, True  # Return True for plural
-
-        # Try to find single EditorGroup
-        pattern_singular = r"EditorGroup\s*=\s*\"?([^\n\"]+)\"?"
-        match_singular = re.search(pattern_singular, content, re.IGNORECASE)
-        if match_singular:
-            group = match_singular.group(1).split('//')[0].strip()
-            return [group], False  # Return False for singular
-
-        return [], False  # Default to empty list and False
-
     def setup_part_fields(self):
         # Part Fields Frame
         self.part_fields_frame = tk.Frame(self.scrollable_frame)
@@ -401,63 +433,38 @@ class TechRulesGenerator(tk.Tk):
             return
 
         # Compute relative path from techs.rules directory to Part file
-        techrules_dir = os.path.dirname(techrules_path)
         try:
-            relative_path = os.path.relpath(part_path, techrules_dir).replace("\\", "/")
+            relative_path = relative_rules_path(part_path, techrules_path)
         except Exception as e:
             messagebox.showerror("Error", f"Error computing relative path: {e}")
             return
 
         # Handle EditorGroups
-        selected_indices = self.editorgroups_listbox.curselection()
-        if not selected_indices:
-            messagebox.showerror("Error", "Please select at least one Editor Group.")
+        try:
+            editorgroup_line = editorgroup_field(
+                relative_path,
+                self.editorgroups_listbox.curselection(),
+                self.editorgroups_listbox.size(),
+                self.is_editorgroups_plural
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
 
-        total_editorgroups = self.editorgroups_listbox.size()
-        if self.is_editorgroups_plural:
-            if len(selected_indices) == total_editorgroups:
-                # All editor groups selected
-                editorgroup_field = f"EditorGroups = &<{relative_path}>/Part/EditorGroups"
-            elif len(selected_indices) == 1:
-                # Single Editor Group selected
-                index = selected_indices[0]
-                editorgroup_field = f"EditorGroup = &<{relative_path}>/Part/EditorGroups/{index}"
-            else:
-                # Multiple but not all editor groups selected
-                editorgroup_paths = [f"&<{relative_path}>/Part/EditorGroups/{idx}" for idx in selected_indices]
-                editorgroup_field = f"EditorGroups = [{', '.join(editorgroup_paths)}]"
-        else:
-            # Part file has singular EditorGroup
-            if len(selected_indices) == 1:
-                editorgroup_field = f"EditorGroup = &<{relative_path}>/Part/EditorGroup"
-            else:
-                messagebox.showerror("Error", "Cannot select multiple Editor Groups when Part file has single 'EditorGroup'.")
-                return
-
-        # Format PartsUnlocked
-        parts_unlocked_formatted = f"[{', '.join(parts_unlocked_list)}]"
-
         # Format Prerequisites
-        prerequisites_formatted = ""
-        if prerequisites:
-            prerequisites_list = [prereq.strip() for prereq in prerequisites.split(',') if prereq.strip()]
-            prerequisites_formatted = f"    Prerequisites = [{', '.join(prerequisites_list)}]\n"
+        prerequisites_list = [prereq.strip() for prereq in prerequisites.split(',') if prereq.strip()]
 
         # Final Output
-        formatted_output = f"""
-{{
-    ID = {part_id}
-    NameKey = &<{relative_path}>/Part/NameKey
-    DescriptionKey = &<{relative_path}>/Part/DescriptionKey
-    Icon = &<{relative_path}>/Part/EditorIcon
-    {editorgroup_field}
-    PartsUnlocked = {parts_unlocked_formatted}
-{prerequisites_formatted}    Cost = {cost}
-}}
-"""
+        formatted_output = format_tech_entry(part_id, relative_path, editorgroup_line, parts_unlocked_list, prerequisites_list, cost)
         self.display_output(formatted_output.strip())
 
+        # Check the new entry against the existing tech tree before it gets pasted in
+        graph = self.load_tech_graph(techrules_path)
+        if graph is not None:
+            cycle = graph.would_create_cycle(part_id, prerequisites_list)
+            if cycle:
+                messagebox.showwarning("Warning", "This tech would create a prerequisite cycle:\n\n" + " -> ".join(cycle))
+
     def display_output(self, formatted_output):
         # Create or clear the output text box
         if 'output_text' not in self.dynamic_fields:
@@ -477,6 +484,8 @@ class TechRulesGenerator(tk.Tk):
             self.dynamic_fields['copy_button'].pack(side='left', padx=5)
             self.dynamic_fields['save_button'] = tk.Button(button_frame, text="Save as File", command=lambda: self.save_to_file(formatted_output))
             self.dynamic_fields['save_button'].pack(side='left', padx=5)
+            self.dynamic_fields['upsert_button'] = tk.Button(button_frame, text="Add/Update in techs.rules", command=self.upsert_output)
+            self.dynamic_fields['upsert_button'].pack(side='left', padx=5)
 
     def reset_fields(self):
         # Clear Part-related entries
@@ -500,6 +509,9 @@ class TechRulesGenerator(tk.Tk):
         if 'save_button' in self.dynamic_fields:
             self.dynamic_fields['save_button'].pack_forget()
             del self.dynamic_fields['save_button']
+        if 'upsert_button' in self.dynamic_fields:
+            self.dynamic_fields['upsert_button'].pack_forget()
+            del self.dynamic_fields['upsert_button']
 
         # Re-setup the part fields
         self.setup_part_fields()
@@ -526,6 +538,33 @@ class TechRulesGenerator(tk.Tk):
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save file: {e}")
 
+    def get_techs_file(self, techrules_path):
+        """Return the cached TechsFile for techrules_path, re-reading it only if it changed on disk."""
+        techrules_abs = os.path.abspath(techrules_path)
+        if self.techs_file is None or self.techs_file.path != techrules_abs:
+            self.techs_file = TechsFile(techrules_abs)
+        else:
+            self.techs_file.reload_if_changed()
+        return self.techs_file
+
+    def upsert_output(self):
+        """Write the generated entry straight into techs.rules, replacing an entry with the same ID."""
+        techrules_path = self.techrules_entry.get()
+        if not techrules_path or not os.path.exists(techrules_path):
+            messagebox.showerror("Error", "Please select an existing techs.rules file first.")
+            return
+        entry_text = self.dynamic_fields['output_text'].get(1.0, tk.END).strip()
+        try:
+            techs_file = self.get_techs_file(techrules_path)
+            result = techs_file.upsert(entry_text)
+            techs_file.save()
+        except Exception as e:
+            # Drop the cache so the next attempt starts from what is on disk
+            self.techs_file = None
+            messagebox.showerror("Error", f"Failed to update techs.rules: {e}")
+            return
+        messagebox.showinfo("Saved", f"Tech entry {result} in {techrules_path}")
+
     def show_techrules(self):
         techrules_path = self.techrules_entry.get()
 
@@ -539,10 +578,9 @@ class TechRulesGenerator(tk.Tk):
             messagebox.showerror("Error", f"techs.rules file does not exist at: {techrules_abs}")
             return
 
-        # Read techs.rules file
+        # Read techs.rules file (cached until it changes on disk)
         try:
-            with open(techrules_abs, 'r') as file:
-                content = file.read()
+            content = self.get_techs_file(techrules_abs).display_text()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read techs.rules file: {e}")
             return
@@ -557,6 +595,84 @@ class TechRulesGenerator(tk.Tk):
 
         text_box.insert(tk.END, content)
 
+    def load_tech_graph(self, techrules_path):
+        """Return the prerequisite graph of techs.rules, rebuilding it only when the file changed."""
+        try:
+            stat = os.stat(techrules_path)
+        except OSError:
+            return None
+        key = (os.path.abspath(techrules_path), stat.st_mtime_ns, stat.st_size)
+        if key != self.tech_graph_key:
+            try:
+                with open(techrules_path, 'r', encoding='utf-8', errors='replace') as file:
+                    self.tech_graph = TechGraph.from_content(file.read())
+            except OSError:
+                return None
+            self.tech_graph_key = key
+        return self.tech_graph
+
+    def validate_tech_tree(self):
+        """Check techs.rules for prerequisite cycles, unreachable techs and unknown prerequisites."""
+        techrules_path = self.techrules_entry.get()
+        if not techrules_path:
+            messagebox.showerror("Error", "Please select the techs.rules file first.")
+            return
+        graph = self.load_tech_graph(techrules_path)
+        if graph is None:
+            messagebox.showerror("Error", f"Failed to read techs.rules file at: {techrules_path}")
+            return
+
+        popup = tk.Toplevel(self)
+        popup.title("Tech Tree Validation")
+        popup.geometry("800x600")
+
+        text_box = tk.Text(popup, wrap='word')
+        text_box.pack(expand=True, fill='both', padx=10, pady=10)
+        text_box.insert(tk.END, format_report(graph.validate()))
+
+    def check_references(self):
+        """Check every &<file>/Path reference in the mod (or just techs.rules) on a worker thread."""
+        mod_root = self.config.get('Paths', 'mod_root', fallback=None)
+        techrules_path = self.techrules_entry.get()
+        if not mod_root and not techrules_path:
+            messagebox.showerror("Error", "Please select your mod.rules or techs.rules file first.")
+            return
+
+        results = queue.Queue()
+
+        def run():
+            try:
+                if mod_root:
+                    results.put(('done', self.reference_resolver.check_mod(mod_root)))
+                else:
+                    results.put(('done', self.reference_resolver.check_files([techrules_path])))
+            except Exception as e:
+                results.put(('error', str(e)))
+
+        self.check_references_button.config(state='disabled', text="Checking References...")
+        threading.Thread(target=run, daemon=True).start()
+        self.after(100, lambda: self.poll_reference_check(results, mod_root))
+
+    def poll_reference_check(self, results, root):
+        try:
+            kind, payload = results.get_nowait()
+        except queue.Empty:
+            self.after(100, lambda: self.poll_reference_check(results, root))
+            return
+        self.check_references_button.config(state='normal', text="Check References")
+        if kind == 'error':
+            messagebox.showerror("Error", f"Failed to check references: {payload}")
+            return
+        problems, counts = payload
+
+        popup = tk.Toplevel(self)
+        popup.title("Reference Check")
+        popup.geometry("800x600")
+
+        text_box = tk.Text(popup, wrap='word')
+        text_box.pack(expand=True, fill='both', padx=10, pady=10)
+        text_box.insert(tk.END, format_problems(problems, counts, root))
+
     def open_prerequisite_dialog(self):
         """Open a dialog that allows users to select prerequisite IDs from a list."""
         # Ensure mod root is determined
@@ -565,7 +681,7 @@ class TechRulesGenerator(tk.Tk):
             messagebox.showerror("Error", "Mod root could not be determined. Please select the mod.rules file first.")
             return
 
-        if not self.prerequisite_ids:
+        if not self.prerequisite_ids and not self.is_scanning():
             messagebox.showerror("Error", "No Part IDs found in the mod.")
             return
 
@@ -578,21 +694,15 @@ class TechRulesGenerator(tk.Tk):
         instructions = tk.Label(popup, text="Select Prerequisite IDs from your mod:")
         instructions.pack(pady=10)
 
-        # Listbox with multiple selection
-        self.prereq_listbox = tk.Listbox(popup, selectmode=tk.MULTIPLE, width=50, height=20)
-        self.prereq_listbox.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
-
-        # Populate the listbox
-        for idx, prereq in enumerate(self.prerequisite_ids):
-            self.prereq_listbox.insert(tk.END, prereq)
-
         # Pre-select already selected prerequisites
         current_prereq = self.dynamic_fields.get('prerequisites_entry', tk.Entry(self)).get().strip()
-        if current_prereq:
-            selected = [pr.strip() for pr in current_prereq.split(',') if pr.strip()]
-            for i, prereq in enumerate(self.prerequisite_ids):
-                if prereq in selected:
-                    self.prereq_listbox.select_set(i)
+        selected = {pr.strip() for pr in current_prereq.split(',') if pr.strip()}
+
+        # Filterable ID picker with multiple selection
+        self.prereq_picker = PartIdPicker(popup, ids=self.prerequisite_ids, selected=selected)
+        self.prereq_picker.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Keep the picker updated while the mod scan is still running
+        self.register_id_picker(self.prereq_picker)
 
         # Buttons
         button_frame = tk.Frame(popup)
@@ -601,36 +711,203 @@ class TechRulesGenerator(tk.Tk):
         select_button = tk.Button(button_frame, text="Select", command=lambda: self.set_prerequisites(popup))
         select_button.pack(side=tk.LEFT, padx=5)
 
+        select_shown_button = tk.Button(button_frame, text="Select Shown", command=self.prereq_picker.select_shown)
+        select_shown_button.pack(side=tk.LEFT, padx=5)
+
+        clear_button = tk.Button(button_frame, text="Clear", command=self.prereq_picker.clear_selection)
+        clear_button.pack(side=tk.LEFT, padx=5)
+
     def load_prerequisite_ids(self, mod_root):
-        """Scan all .rules files in the mod root to collect Part IDs."""
-        part_ids = []
-        for root, dirs, files in os.walk(mod_root):
-            for file in files:
-                if file.endswith(".rules"):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r') as f:
-                            content = f.read()
-                    except:
-                        continue
-
-                    # Check if file defines a Part
-                    if re.search(r'^\s*Part\s*:', content, re.MULTILINE):
-                        # Extract Part IDs
-                        ids = re.findall(r'^\s*ID\s*=\s*\"?([^\n\"]+)\"?', content, re.MULTILINE)
-                        for id_value in ids:
-                            id_value = id_value.split('//')[0].strip()
-                            part_ids.append(id_value)
-
-        self.prerequisite_ids = sorted(set(part_ids))
-        # Save to config
-        self.config['Prerequisites']['part_ids'] = ','.join(self.prerequisite_ids)
-        self.save_config()
+        """Collect Part IDs from the mod index on a worker thread, re-parsing only .rules files that changed."""
+        self.cancel_prerequisite_scan()
+        self.stop_watcher()
+        results = queue.Queue()
+        self.scan_cancel = threading.Event()
+        self.scan_queue = results
+        self.scan_thread = threading.Thread(
+            target=self._scan_prerequisites,
+            args=(mod_root, self.scan_cancel, results),
+            daemon=True
+        )
+        self.scan_thread.start()
+        self.scan_status_label.config(text="Scanning mod for Part IDs...")
+        self.scan_cancel_button.pack(side='left', padx=10)
+        self.after(100, lambda: self.poll_prerequisite_scan(mod_root, results))
+
+    def _scan_prerequisites(self, mod_root, cancel, results):
+        """Worker thread: report cached IDs first, then IDs from changed files as they are parsed."""
+        try:
+            with ModIndex(mod_root) as index:
+                results.put(('ids', index.part_ids()))
+                refresh = index.iter_refresh(
+                    progress=lambda done, total: results.put(('progress', done, total)), cancel=cancel
+                )
+                try:
+                    for _path, record in refresh:
+                        if record['part_ids']:
+                            results.put(('ids', record['part_ids']))
+                finally:
+                    refresh.close()
+                # iter_refresh checks cancel during the walk and between files, and stops early
+                if cancel.is_set():
+                    results.put(('cancelled', None))
+                    return
+                results.put(('done', index.part_ids()))
+        except Exception as e:
+            results.put(('error', str(e)))
+
+    def poll_prerequisite_scan(self, mod_root, results):
+        """Drain scan results on the Tk thread and reschedule until the scan finishes."""
+        if results is not self.scan_queue:
+            return  # A newer scan replaced this one
+        # IDs from every file in this tick go to the pickers in one batch
+        found = []
+        while True:
+            try:
+                message = results.get_nowait()
+            except queue.Empty:
+                break
+            kind, payload = message[0], message[1:]
+            if kind == 'ids':
+                found.extend(payload[0])
+            elif kind == 'progress':
+                done, total = payload
+                self.scan_status_label.config(text=f"Scanning mod for Part IDs... {done}/{total} changed files parsed")
+            else:
+                if found:
+                    self.add_prerequisite_ids(found)
+                self.finish_prerequisite_scan()
+                if kind == 'done':
+                    self.set_prerequisite_ids(payload[0])
+                    self.scan_status_label.config(text=f"{len(self.prerequisite_ids)} Part IDs found.")
+                    self.start_watcher(mod_root)
+                    if self.pending_batch is not None:
+                        if self.pending_batch[0] == mod_root:
+                            self.write_pending_batch()
+                        else:
+                            self.load_prerequisite_ids(self.pending_batch[0])
+                    return
+                self.pending_batch = None
+                if kind == 'cancelled':
+                    self.scan_status_label.config(text="Scan cancelled. Part ID list may be incomplete.")
+                else:
+                    self.scan_status_label.config(text="")
+                    messagebox.showerror("Error", f"Failed to scan mod for Part IDs: {payload[0]}")
+                return
+        if found:
+            self.add_prerequisite_ids(found)
+        self.after(100, lambda: self.poll_prerequisite_scan(mod_root, results))
+
+    def is_scanning(self):
+        return self.scan_thread is not None and self.scan_thread.is_alive()
+
+    def cancel_prerequisite_scan(self):
+        if self.scan_cancel is not None:
+            self.scan_cancel.set()
+
+    def finish_prerequisite_scan(self):
+        self.scan_thread = None
+        self.scan_cancel = None
+        self.scan_cancel_button.pack_forget()
+
+    def register_id_picker(self, picker):
+        """Mirror prerequisite_ids into an open dialog's picker until it is closed."""
+        self.id_pickers.append(picker)
+        picker.bind("<Destroy>", lambda e: e.widget is picker and picker in self.id_pickers and self.id_pickers.remove(picker))
+
+    def add_prerequisite_ids(self, ids):
+        """Insert newly found IDs in sorted position, updating any open ID pickers."""
+        for part_id in ids:
+            index = bisect.bisect_left(self.prerequisite_ids, part_id)
+            if index == len(self.prerequisite_ids) or self.prerequisite_ids[index] != part_id:
+                self.prerequisite_ids.insert(index, part_id)
+        for picker in self.id_pickers:
+            picker.add_ids(ids)
+
+    def remove_prerequisite_ids(self, ids):
+        """Remove IDs that are gone from the mod, updating any open ID pickers."""
+        for part_id in ids:
+            index = bisect.bisect_left(self.prerequisite_ids, part_id)
+            if index < len(self.prerequisite_ids) and self.prerequisite_ids[index] == part_id:
+                del self.prerequisite_ids[index]
+        for picker in self.id_pickers:
+            picker.remove_ids(ids)
+
+    def set_prerequisite_ids(self, ids):
+        """Replace the ID list. Open pickers keep their selection."""
+        self.prerequisite_ids = list(ids)
+        for picker in self.id_pickers:
+            picker.set_ids(self.prerequisite_ids)
+
+    def start_watcher(self, mod_root):
+        """Watch the mod root so the index is updated as .rules files change."""
+        self.stop_watcher()
+        # A fresh queue per watcher, so nothing queued for the previous mod is applied to this one
+        self.watch_queue = queue.Queue()
+        root = os.path.abspath(mod_root)
+        watch_queue = self.watch_queue
+        self.watcher = RulesWatcher(
+            root, lambda changed, removed: self._index_watched_changes(root, watch_queue, changed, removed)
+        )
+        self.watcher.start()
+        self._watch_after = self.after(250, self.poll_watcher)
+
+    def stop_watcher(self):
+        if self._watch_after is not None:
+            self.after_cancel(self._watch_after)
+            self._watch_after = None
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _index_watched_changes(self, mod_root, watch_queue, changed, removed):
+        """Watcher thread: update the index for changed files and queue the Part IDs that came and went."""
+        try:
+            with ModIndex(mod_root) as index:
+                before = set(index.part_ids())
+                for path in removed:
+                    index.remove_file(path)
+                for path in changed:
+                    index.update_file(path)
+                after = set(index.part_ids())
+        except (OSError, sqlite3.Error):
+            return  # The next change or scan brings the index up to date
+        if after != before:
+            watch_queue.put((sorted(after - before), sorted(before - after)))
+
+    def poll_watcher(self):
+        """Hand Part IDs added or removed by watched file changes to the ID list and pickers."""
+        if self.watcher is None:
+            return
+        added = set()
+        removed = set()
+        while True:
+            try:
+                new_ids, gone_ids = self.watch_queue.get_nowait()
+            except queue.Empty:
+                break
+            added.difference_update(gone_ids)
+            removed.difference_update(new_ids)
+            added.update(new_ids)
+            removed.update(gone_ids)
+        if removed:
+            self.remove_prerequisite_ids(sorted(removed))
+        if added:
+            self.add_prerequisite_ids(sorted(added))
+        self._watch_after = self.after(250, self.poll_watcher)
+
+    def on_close(self):
+        self.cancel_prerequisite_scan()
+        self.stop_watcher()
+        try:
+            self.config_writer.flush()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save config: {e}")
+        self.destroy()
 
     def set_prerequisites(self, popup):
         """Set the selected prerequisites in the prerequisites entry."""
-        selected_indices = self.prereq_listbox.curselection()
-        selected_ids = [self.prerequisite_ids[i] for i in selected_indices]
+        selected_ids = self.prereq_picker.selected_ids()
         prerequisites_str = ', '.join(selected_ids)
 
         # Set the prerequisites in the entry field
@@ -648,7 +925,7 @@ class TechRulesGenerator(tk.Tk):
             messagebox.showerror("Error", "Mod root could not be determined. Please select the mod.rules file first.")
             return
 
-        if not self.prerequisite_ids:
+        if not self.prerequisite_ids and not self.is_scanning():
             messagebox.showerror("Error", "No Part IDs found in the mod.")
             return
 
@@ -661,41 +938,37 @@ class TechRulesGenerator(tk.Tk):
         instructions = tk.Label(popup, text="Select Parts Unlocked from your mod:")
         instructions.pack(pady=10)
 
-        # Listbox with multiple selection
-        parts_listbox = tk.Listbox(popup, selectmode=tk.MULTIPLE, width=50, height=20)
-        parts_listbox.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
-
-        # Populate the listbox
-        for idx, part in enumerate(self.prerequisite_ids):
-            parts_listbox.insert(tk.END, part)
-
         # Pre-select already selected parts
         current_parts = self.dynamic_fields.get('partsunlocked_entry', tk.Entry(self)).get().strip()
-        if current_parts:
-            selected = [pr.strip() for pr in current_parts.split(',') if pr.strip()]
-            for i, part in enumerate(self.prerequisite_ids):
-                if part in selected:
-                    parts_listbox.select_set(i)
+        selected = {pr.strip() for pr in current_parts.split(',') if pr.strip()}
 
         # Ensure current part ID is selected by default
         current_part_id = self.part_id_entry.get()
         if current_part_id:
-            for i, part in enumerate(self.prerequisite_ids):
-                if part == current_part_id:
-                    parts_listbox.select_set(i)
-                    break
+            selected.add(current_part_id)
+
+        # Filterable ID picker with multiple selection
+        parts_picker = PartIdPicker(popup, ids=self.prerequisite_ids, selected=selected)
+        parts_picker.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Keep the picker updated while the mod scan is still running
+        self.register_id_picker(parts_picker)
 
         # Buttons
         button_frame = tk.Frame(popup)
         button_frame.pack(pady=10)
 
-        select_button = tk.Button(button_frame, text="Select", command=lambda: self.set_partsunlocked(parts_listbox, popup))
+        select_button = tk.Button(button_frame, text="Select", command=lambda: self.set_partsunlocked(parts_picker, popup))
         select_button.pack(side=tk.LEFT, padx=5)
 
-    def set_partsunlocked(self, parts_listbox, popup):
+        select_shown_button = tk.Button(button_frame, text="Select Shown", command=parts_picker.select_shown)
+        select_shown_button.pack(side=tk.LEFT, padx=5)
+
+        clear_button = tk.Button(button_frame, text="Clear", command=parts_picker.clear_selection)
+        clear_button.pack(side=tk.LEFT, padx=5)
+
+    def set_partsunlocked(self, parts_picker, popup):
         """Set the selected parts in the partsunlocked entry."""
-        selected_indices = parts_listbox.curselection()
-        selected_parts = [self.prerequisite_ids[i] for i in selected_indices]
+        selected_parts = parts_picker.selected_ids()
         partsunlocked_str = ', '.join(selected_parts)
 
         # Set the partsunlocked in the entry field
@@ -705,6 +978,50 @@ class TechRulesGenerator(tk.Tk):
         # Close the pop-up
         popup.destroy()
 
+    def generate_all_techs(self):
+        """Write a complete techs.rules with one tech entry for every Part in the mod."""
+        mod_root = self.config.get('Paths', 'mod_root', fallback=None)
+        if not mod_root:
+            messagebox.showerror("Error", "Mod root is not set. Please select your mod.rules file first.")
+            return
+        cost = self.dynamic_fields['cost_entry'].get().strip() if 'cost_entry' in self.dynamic_fields else ''
+        if not cost:
+            cost = simpledialog.askinteger("Cost", "Cost for every generated tech:", initialvalue=DEFAULT_BATCH_COST, minvalue=0, parent=self)
+            if cost is None:
+                return
+
+        techrules_path = self.techrules_entry.get() or os.path.join(mod_root, 'modes', 'career', 'techs.rules')
+        file_path = filedialog.asksaveasfilename(
+            title="Save Batch techs.rules As",
+            defaultextension=".rules",
+            filetypes=[("Rules Files", "*.rules"), ("All Files", "*.*")],
+            initialdir=os.path.dirname(techrules_path),
+            initialfile=os.path.basename(techrules_path)
+        )
+        if not file_path:
+            return
+
+        self.pending_batch = (mod_root, file_path, cost)
+        # The watcher keeps the index current once a scan has finished; otherwise
+        # bring it up to date with the background scan, which writes the file when done
+        if self.watcher is not None and self.watcher.root == os.path.abspath(mod_root) and not self.is_scanning():
+            self.write_pending_batch()
+        else:
+            if not self.is_scanning():
+                self.load_prerequisite_ids(mod_root)
+            self.scan_status_label.config(text="Scanning mod for Part IDs... the batch techs.rules is written when done")
+
+    def write_pending_batch(self):
+        mod_root, file_path, cost = self.pending_batch
+        self.pending_batch = None
+        try:
+            with ModIndex(mod_root) as index:
+                count = write_batch_techs(index.parts(), file_path, cost)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate techs: {e}")
+            return
+        messagebox.showinfo("Success", f"{count} tech entries written to: {file_path}")
+
     def generate_techs_rules(self):
         mod_root = self.config.get('Paths', 'mod_root', fallback=None)
         if not mod_root:
@@ -726,17 +1043,7 @@ class TechRulesGenerator(tk.Tk):
         # Define the scaffolding content
         scaffolding = """//AutoGenerated by TechRulesGenerator
 
-//Instructions: Uncomment and add the following snippet to your mod.rules file to activate this file:
-
-// +++++++++ vv insert below in mod.rules vv ++++++++++ //
-// Adding Techs to Career Mode
-/*{
-    Action = AddMany
-    AddTo = "<./Data/modes/career/techs.rules>/Techs"
-    ManyToAdd = &<modes/career/techs.rules>/Techs
-}*/
-// +++++++++ ^^ insert above in mod.rules ^^ ++++++++++ //
-
+""" + MOD_RULES_SNIPPET + """
 Techs
 [
 